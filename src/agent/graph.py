@@ -1,7 +1,13 @@
 """LangGraph orchestration for tax certificate extraction."""
-from langgraph.graph import StateGraph, END
+import asyncio
+import functools
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from langgraph.graph import StateGraph, START, END
 from loguru import logger
 
+from src.config import DATASET_SCHEMA, settings
 from src.state import AgentState, PropertyID, FilePath, create_agent_state
 from src.tools.document_loader import load_property_documents
 from src.tools.dataset_tools import (
@@ -9,7 +15,7 @@ from src.tools.dataset_tools import (
     get_linked_documents,
     update_dataset
 )
-from src.extraction.extractor import TaxDataExtractor
+from src.extraction.extractor import TaxDataExtractor, close_async_client
 from src.validation.validator import DatasetValidator
 
 
@@ -17,90 +23,104 @@ from src.validation.validator import DatasetValidator
 extractor = TaxDataExtractor()
 validator = DatasetValidator()
 
+# Merged datasets carry exactly the schema's fields
+_SCHEMA_KEYS = tuple(DATASET_SCHEMA["properties"])
+
 
 # === NODE FUNCTIONS ===
 
-def load_existing_node(state: AgentState) -> AgentState:
+async def load_existing_node(state: AgentState) -> dict:
     """
     Load existing dataset and linked documents for incremental updates.
 
     This node checks if the property already has partial data extracted
-    from previous processing runs.
+    from previous processing runs. Runs in parallel with load_documents_node.
     """
-    logger.info(f" Loading existing data for property: {state['property_id']}")
+    logger.info(" Loading existing data for property: {}", state.property_id)
 
-    existing_dataset = get_existing_dataset(state['property_id'])
-    linked_documents = get_linked_documents(state['property_id'])
+    # Dataset and linked-document lookups are independent disk reads
+    existing_dataset, linked_documents = await asyncio.gather(
+        asyncio.to_thread(get_existing_dataset, state.property_id),
+        asyncio.to_thread(get_linked_documents, state.property_id)
+    )
 
-    state['existing_dataset'] = existing_dataset
-    state['linked_documents'] = linked_documents
+    processing_log = []
 
     if existing_dataset:
-        logger.info(f" Found existing dataset with {len(existing_dataset)} fields")
-        state['processing_log'].append(f"Loaded existing dataset ({len(existing_dataset)} fields)")
+        logger.info(" Found existing dataset with {} fields", len(existing_dataset))
+        processing_log.append(f"Loaded existing dataset ({len(existing_dataset)} fields)")
     else:
         logger.info("No existing dataset found (new property)")
-        state['processing_log'].append("No existing dataset (new property)")
+        processing_log.append("No existing dataset (new property)")
 
     if linked_documents:
-        logger.info(f" Found {len(linked_documents)} linked document(s)")
-        state['processing_log'].append(f"Loaded {len(linked_documents)} linked documents")
+        logger.info(" Found {} linked document(s)", len(linked_documents))
+        processing_log.append(f"Loaded {len(linked_documents)} linked documents")
 
-    return state
+    return {
+        "existing_dataset": existing_dataset,
+        "linked_documents": linked_documents,
+        "processing_log": processing_log,
+    }
 
 
-def load_documents_node(state: AgentState) -> AgentState:
+async def load_documents_node(state: AgentState) -> dict:
     """
     Extract PDF documents from the property zip file.
 
-    This loads the new documents that need to be processed.
+    This loads the new documents that need to be processed. Runs in
+    parallel with load_existing_node.
     """
-    logger.info(f"📄 Loading documents from: {state['zip_file_path']}")
+    logger.info(" Loading documents from: {}", state.zip_file_path)
 
-    new_documents = load_property_documents(state['zip_file_path'])
+    new_documents = await asyncio.to_thread(load_property_documents, state.zip_file_path)
 
-    state['new_documents'] = new_documents
-    state['all_documents'] = state['linked_documents'] + new_documents
+    logger.info(" Loaded {} new document(s)", len(new_documents))
 
-    logger.info(f" Loaded {len(new_documents)} new document(s)")
-    logger.info(f"Total documents available: {len(state['all_documents'])}")
+    return {
+        "new_documents": new_documents,
+        "processing_log": [f"Loaded {len(new_documents)} new documents"],
+    }
 
-    state['processing_log'].append(f"Loaded {len(new_documents)} new documents")
 
-    return state
-
-
-def extract_node(state: AgentState) -> AgentState:
+async def extract_node(state: AgentState) -> dict:
     """
     Extract tax data using hybrid text/vision approach.
 
     This node intelligently routes to text-only or vision extraction
-    based on PDF text quality.
+    based on PDF text quality. It is the join point for the two load nodes.
     """
+    all_documents = state.linked_documents + state.new_documents
+    logger.info("Total documents available: {}", len(all_documents))
+
     logger.info(" Extracting tax data from documents")
 
     # Use new documents for extraction (existing data passed for merging context)
-    extracted_data = extractor.extract(
-        documents=state['new_documents'],
-        existing_dataset=state['existing_dataset']
+    extracted_data = await extractor.aextract(
+        documents=state.new_documents,
+        existing_dataset=state.existing_dataset
     )
 
-    state['extracted_data'] = extracted_data
+    update = {
+        "all_documents": all_documents,
+        "extracted_data": extracted_data,
+        "processing_log": [],
+    }
 
     # Log extraction method used
     stats = extractor.get_extraction_stats()
     if stats['total_extractions'] > 0:
-        method = "text" if state['new_documents'] and stats['text_extractions'] > stats['vision_extractions'] else "vision"
-        state['extraction_method'] = method
-        logger.info(f"Used {method} extraction")
-        state['processing_log'].append(f"Extraction method: {method}")
+        method = "text" if state.new_documents and stats['text_extractions'] > stats['vision_extractions'] else "vision"
+        update['extraction_method'] = method
+        logger.info("Used {} extraction", method)
+        update['processing_log'].append(f"Extraction method: {method}")
 
     logger.info(" Data extraction complete")
 
-    return state
+    return update
 
 
-def merge_node(state: AgentState) -> AgentState:
+def merge_node(state: AgentState) -> dict:
     """
     Merge extracted data with existing dataset.
 
@@ -111,35 +131,49 @@ def merge_node(state: AgentState) -> AgentState:
     logger.info(" Merging data")
 
     # If we have both existing and new data, ensure completeness
-    if state['existing_dataset'] and state['extracted_data']:
-        merged = state['extracted_data'].copy()
-
-        # Fill in any missing fields from existing data
-        # (Claude may have returned updated/merged data already)
-        for key, value in state['existing_dataset'].items():
-            if key not in merged or merged[key] is None:
-                merged[key] = value
-                logger.debug(f"Retained existing value for {key}")
+    if state.existing_dataset and state.extracted_data:
+        extracted = state.extracted_data
+
+        # Every schema field, then existing values, then non-null extracted
+        # values on top (Claude may have returned merged data already).
+        # Extra keys such as _dateSelectionReasoning are kept, as on the
+        # no-merge path.
+        merged = {
+            **dict.fromkeys(_SCHEMA_KEYS),
+            **state.existing_dataset,
+            **{key: value for key, value in extracted.items() if value is not None},
+        }
+        logger.opt(lazy=True).debug(
+            "Retained existing values for {}",
+            lambda: ", ".join(
+                key for key, value in state.existing_dataset.items()
+                if extracted.get(key) is None and value is not None
+            ) or "none"
+        )
 
-        state['final_dataset'] = merged
         logger.info(" Merged existing and new data")
-        state['processing_log'].append("Merged with existing dataset")
+        return {
+            "final_dataset": merged,
+            "processing_log": ["Merged with existing dataset"],
+        }
 
-    elif state['extracted_data']:
-        state['final_dataset'] = state['extracted_data']
+    elif state.extracted_data:
         logger.info(" Using extracted data (no existing dataset)")
-        state['processing_log'].append("Using new extraction (no merge needed)")
+        return {
+            "final_dataset": state.extracted_data,
+            "processing_log": ["Using new extraction (no merge needed)"],
+        }
 
     else:
         # Shouldn't happen, but handle gracefully
-        state['final_dataset'] = state['existing_dataset'] or {}
         logger.warning("No extracted data available")
-        state['processing_log'].append("Warning: No extracted data")
-
-    return state
+        return {
+            "final_dataset": state.existing_dataset or {},
+            "processing_log": ["Warning: No extracted data"],
+        }
 
 
-def validate_node(state: AgentState) -> AgentState:
+def validate_node(state: AgentState) -> dict:
     """
     Validate the final dataset against schema and business rules.
 
@@ -147,56 +181,61 @@ def validate_node(state: AgentState) -> AgentState:
     """
     logger.info(" Validating final dataset")
 
-    is_valid, errors = validator.validate(state['final_dataset'])
+    is_valid, errors = validator.validate(state.final_dataset)
 
     # Store validation results
-    state['validation_issues'] = [
+    validation_issues = [
         {"type": "error", "message": error} for error in errors
     ]
 
     if is_valid:
         logger.info(" Validation passed")
-        state['processing_log'].append("Validation: PASSED")
+        log_entry = "Validation: PASSED"
     else:
-        logger.warning(f" Validation found {len(errors)} issue(s)")
-        state['processing_log'].append(f"Validation: {len(errors)} issues found")
+        logger.warning(" Validation found {} issue(s)", len(errors))
+        log_entry = f"Validation: {len(errors)} issues found"
 
-    return state
+    return {
+        "validation_issues": validation_issues,
+        "processing_log": [log_entry],
+    }
 
 
-def save_node(state: AgentState) -> AgentState:
+def save_node(state: AgentState) -> dict:
     """
     Save the final dataset and archive documents.
 
     This persists the results for future incremental updates.
     """
-    logger.info(f" Saving dataset for property: {state['property_id']}")
+    logger.info(" Saving dataset for property: {}", state.property_id)
 
     update_dataset(
-        property_id=state['property_id'],
-        dataset=state['final_dataset'],
-        documents=state['new_documents']
+        property_id=state.property_id,
+        dataset=state.final_dataset,
+        documents=state.new_documents
     )
 
     logger.info(" Dataset saved successfully")
-    state['processing_log'].append("Dataset saved")
 
-    return state
+    return {"processing_log": ["Dataset saved"]}
 
 
 # === GRAPH CONSTRUCTION ===
 
+@functools.lru_cache(maxsize=1)
 def create_agent_graph() -> StateGraph:
     """
     Create the LangGraph agent workflow.
 
+    The compiled graph is stateless, so it is built once and reused across
+    runs; the extractor and validator stay module-level singletons.
+
     Flow:
-    1. Load existing data (if any)
-    2. Load new documents from zip
-    3. Extract data using hybrid approach
-    4. Merge with existing data
-    5. Validate final dataset
-    6. Save results
+    1. Load existing data (if any) and load new documents from zip, in parallel
+    2. Extract data using hybrid approach
+    3. Merge with existing data
+    4. Validate final dataset
+    5. Save results
 
     Returns:
         Compiled StateGraph ready for execution
@@ -212,10 +251,10 @@ def create_agent_graph() -> StateGraph:
     workflow.add_node("validate", validate_node)
     workflow.add_node("save", save_node)
 
-    # Define edges (linear workflow)
-    workflow.set_entry_point("load_existing")
-    workflow.add_edge("load_existing", "load_documents")
-    workflow.add_edge("load_documents", "extract")
+    # Define edges (independent loads fan out from START and join at extract)
+    workflow.add_edge(START, "load_existing")
+    workflow.add_edge(START, "load_documents")
+    workflow.add_edge(["load_existing", "load_documents"], "extract")
     workflow.add_edge("extract", "merge")
     workflow.add_edge("merge", "validate")
     workflow.add_edge("validate", "save")
@@ -225,6 +264,17 @@ def create_agent_graph() -> StateGraph:
     return workflow.compile()
 
 
+def _run[T](main: Coroutine[Any, Any, T]) -> T:
+    """asyncio.run(main), closing the run's API client before its loop goes away."""
+    async def _main() -> T:
+        try:
+            return await main
+        finally:
+            await close_async_client()
+
+    return asyncio.run(_main())
+
+
 def run_extraction_agent(
     property_id: PropertyID,
     zip_file_path: FilePath
@@ -241,18 +291,148 @@ def run_extraction_agent(
     Returns:
         Final AgentState with extracted dataset and metadata
     """
-    logger.info(f" Starting extraction agent for property: {property_id}")
+    if not settings().use_langgraph:
+        return run_extraction_fast(property_id, zip_file_path)
 
-    # Initialize state using type-safe helper (Python 3.12+ PEP 692)
+    logger.info(" Starting extraction agent for property: {}", property_id)
+
+    # Initialize state using type-safe helper
     initial_state = create_agent_state(
         property_id=property_id,
         zip_file_path=zip_file_path
     )
 
-    # Create and run graph
+    # Run the (cached) compiled graph
     graph = create_agent_graph()
-    final_state = graph.invoke(initial_state)
+    final_state = AgentState(**_run(graph.ainvoke(initial_state)))
 
-    logger.info(f" Extraction complete for property: {property_id}")
+    logger.info(" Extraction complete for property: {}", property_id)
 
     return final_state
+
+
+def _apply_update(state: AgentState, update: dict) -> None:
+    """Apply a node's partial update the way the graph's channels would."""
+    for key, value in update.items():
+        if key == "processing_log":
+            state.processing_log += value
+        else:
+            setattr(state, key, value)
+
+
+async def _run_nodes(state: AgentState) -> AgentState:
+    """Run the workflow's nodes in graph order on a single state."""
+    # Same fan-out/join as the graph: both loads, then the linear chain.
+    # The join applies load_documents' update before load_existing's, so
+    # processing_log comes out in the same order
+    for update in await asyncio.gather(load_documents_node(state), load_existing_node(state)):
+        _apply_update(state, update)
+
+    _apply_update(state, await extract_node(state))
+    for node in (merge_node, validate_node, save_node):
+        _apply_update(state, node(state))
+
+    return state
+
+
+def run_extraction_fast(
+    property_id: PropertyID,
+    zip_file_path: FilePath
+) -> AgentState:
+    """
+    Run the extraction workflow by calling the node functions directly.
+
+    Produces the same final state as run_extraction_agent, without
+    LangGraph's per-step scheduling and channel copies. Used when
+    USE_LANGGRAPH=0.
+
+    Args:
+        property_id: Unique identifier for the property
+        zip_file_path: Path to zip file containing tax PDFs
+
+    Returns:
+        Final AgentState with extracted dataset and metadata
+    """
+    logger.info(" Starting extraction (direct) for property: {}", property_id)
+
+    initial_state = create_agent_state(
+        property_id=property_id,
+        zip_file_path=zip_file_path
+    )
+    final_state = _run(_run_nodes(initial_state))
+
+    logger.info(" Extraction complete for property: {}", property_id)
+
+    return final_state
+
+
+def run_extraction_agent_batch(
+    items: list[tuple[PropertyID, FilePath]],
+    max_concurrency: int | None = None,
+    on_complete: Callable[[int, AgentState | Exception], None] | None = None
+) -> list[AgentState | Exception]:
+    """
+    Run the extraction workflow for several properties concurrently.
+
+    All properties share one event loop, so their Claude calls overlap on
+    the extractor's pooled async client.
+
+    Args:
+        items: List of (property_id, zip_file_path) pairs
+        max_concurrency: Maximum properties in flight at once (None for no limit)
+        on_complete: Optional callback receiving (item index, result) as each
+            item finishes, in completion order
+
+    Returns:
+        Final AgentState per item, in input order, or the exception that
+        item's run raised
+    """
+    if len(items) == 1:
+        # Nothing to overlap: skip the semaphore and gather and run the
+        # single-property path inline (which also honours USE_LANGGRAPH=0)
+        property_id, zip_file_path = items[0]
+        try:
+            result = run_extraction_agent(property_id, zip_file_path)
+        except Exception as e:
+            result = e
+
+        if on_complete:
+            on_complete(0, result)
+        return [result]
+
+    logger.info(" Starting extraction agent for {} properties", len(items))
+
+    graph = create_agent_graph()
+
+    async def _run_one(
+        index: int,
+        property_id: PropertyID,
+        zip_file_path: FilePath,
+        limit: asyncio.Semaphore | None
+    ) -> AgentState | Exception:
+        initial_state = create_agent_state(
+            property_id=property_id,
+            zip_file_path=zip_file_path
+        )
+        try:
+            if limit:
+                async with limit:
+                    result = AgentState(**await graph.ainvoke(initial_state))
+            else:
+                result = AgentState(**await graph.ainvoke(initial_state))
+        except Exception as e:
+            result = e
+
+        if on_complete:
+            on_complete(index, result)
+        return result
+
+    async def _run_all() -> list[AgentState | Exception]:
+        # Created inside the loop that will use it
+        limit = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        return await asyncio.gather(*(
+            _run_one(index, property_id, zip_file_path, limit)
+            for index, (property_id, zip_file_path) in enumerate(items)
+        ))
+
+    return _run(_run_all())
@@ -1,17 +1,78 @@
 """Configuration for the tax certificate extraction agent."""
+import functools
 import os
+from dataclasses import dataclass
 from dotenv import load_dotenv
 
-load_dotenv()
-
-# API Configuration
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-
 # Model Configuration
 MODEL = "claude-sonnet-4-5"  # Claude Sonnet 4.5
 MAX_TOKENS = 2048
 TEMPERATURE = 0
 
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Environment-driven settings."""
+
+    # API Configuration
+    api_key: str | None
+
+    # Extraction cache (set EXTRACT_NO_CACHE=1 to always call Claude)
+    extract_no_cache: bool
+
+    # Start the vision request while the text pass is still running (set
+    # SPECULATIVE_EXTRACT=1). Cuts latency on the vision path, but a cancelled
+    # speculative request may still be billed when text extraction wins.
+    speculative_extract: bool
+
+    # Drop repeated pages before vision extraction (set DEDUP_PAGES=1)
+    dedup_pages: bool
+
+    # Run the workflow through LangGraph (set USE_LANGGRAPH=0 to call the
+    # nodes directly on the single-property path)
+    use_langgraph: bool
+
+    # Deflate implementation for reading zips: auto, stdlib, isal or zlib-ng
+    # (set UNZIP_BACKEND; auto picks isal or zlib-ng when installed)
+    unzip_backend: str
+
+    # Threads for loading datasets when search can't use its index and reads
+    # every file (set SEARCH_LOAD_WORKERS); 0 reads sequentially, which is
+    # fastest on local disk
+    search_load_workers: int
+
+    # Store archived PDFs zstd-compressed (set ARCHIVE_ZSTD=1; needs zstandard)
+    archive_zstd: bool
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Read a boolean flag from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes")
+
+
+@functools.cache
+def settings() -> Settings:
+    """
+    Load settings from the environment (and .env) on first use.
+
+    Cached so .env is read at most once per process, and not at all in
+    worker processes that never need it.
+    """
+    load_dotenv()
+    return Settings(
+        api_key=os.getenv("ANTHROPIC_API_KEY"),
+        extract_no_cache=_env_flag("EXTRACT_NO_CACHE"),
+        speculative_extract=_env_flag("SPECULATIVE_EXTRACT"),
+        dedup_pages=_env_flag("DEDUP_PAGES"),
+        use_langgraph=_env_flag("USE_LANGGRAPH", default=True),
+        unzip_backend=os.getenv("UNZIP_BACKEND", "auto").lower(),
+        search_load_workers=int(os.getenv("SEARCH_LOAD_WORKERS", "0")),
+        archive_zstd=_env_flag("ARCHIVE_ZSTD"),
+    )
+
 # Internal schema (includes hidden fields for search)
 # Note: propertyAddress is extracted and stored but NOT shown to users
 # Only the 7 official fields from tax_certificate_schema.json are user-visible
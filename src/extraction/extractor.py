@@ -1,23 +1,246 @@
 """Hybrid text/vision extraction for tax documents."""
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic, BadRequestError, DefaultHttpxClient, DefaultAsyncHttpxClient
+import asyncio
+import functools
 import json
 import base64
+import contextlib
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import fastjsonschema
+import httpx
 from loguru import logger
 
-from src.config import MODEL, MAX_TOKENS, TEMPERATURE, ANTHROPIC_API_KEY
-from src.extraction.prompts import EXTRACTION_PROMPT, create_extraction_prompt_with_existing
-from src.tools.document_loader import extract_text_from_pdf, assess_text_quality
+from src.config import MODEL, MAX_TOKENS, TEMPERATURE, settings
+from src.extraction.prompts import (
+    EXTRACTION_PROMPT_BYTES,
+    create_extraction_prompt_with_existing,
+    estimate_prompt_tokens,
+    parse_extraction_response,
+    validate_extraction
+)
+from src.tools.document_loader import (
+    extract_text_with_validity,
+    assess_text_quality,
+    is_valid_pdf,
+    dedupe_pdf_pages
+)
+from src.tools.dataset_tools import STORAGE_DIR
 from src.state import DocumentTuple, Dataset
 
 
+# Extraction results keyed on document content fingerprint
+CACHE_DIR = STORAGE_DIR / "cache" / "extract"
+
+# Closing instructions of the user turn for each extraction method
+TEXT_INSTRUCTION = "Here are the tax documents in text format:\n\n{}\n\nPlease extract the dataset."
+VISION_INSTRUCTION = "Please extract the tax dataset from these documents."
+
+
+# Keep idle connections to the API open between calls so back-to-back
+# extractions skip the TLS handshake
+HTTP_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=32,
+    keepalive_expiry=300.0
+)
+
+_aclient: AsyncAnthropic | None = None
+_aclient_loop: asyncio.AbstractEventLoop | None = None
+
+
+@functools.cache
+def get_client() -> Anthropic:
+    """Process-wide sync client, shared by every TaxDataExtractor."""
+    return Anthropic(
+        api_key=settings().api_key,
+        http_client=DefaultHttpxClient(limits=HTTP_LIMITS)
+    )
+
+
+def get_async_client() -> AsyncAnthropic:
+    """
+    Process-wide async client for the running event loop.
+
+    httpx connection pools are bound to the loop they were opened on, so a
+    new client is created only when the caller switches event loops.
+    """
+    global _aclient, _aclient_loop
+    loop = asyncio.get_running_loop()
+    if _aclient is None or _aclient_loop is not loop:
+        _aclient = AsyncAnthropic(
+            api_key=settings().api_key,
+            http_client=DefaultAsyncHttpxClient(limits=HTTP_LIMITS)
+        )
+        _aclient_loop = loop
+    return _aclient
+
+
+async def close_async_client() -> None:
+    """
+    Close the running event loop's async client, if it has one.
+
+    Call before the loop shuts down (the end of each asyncio.run): its
+    connection pool can only be closed on the loop it was opened on.
+    """
+    global _aclient, _aclient_loop
+    if _aclient is None or _aclient_loop is not asyncio.get_running_loop():
+        return
+
+    client, _aclient, _aclient_loop = _aclient, None, None
+    await client.close()
+
+
+def _cached_system(system_prompt: str) -> list[dict]:
+    """
+    Wrap the static system prompt as a prompt-cached block.
+
+    The system prompt is identical across calls, so marking it ephemeral
+    lets Anthropic reuse the cached prefix instead of re-reading it.
+    """
+    return [{
+        "type": "text",
+        "text": system_prompt,
+        "cache_control": {"type": "ephemeral"}
+    }]
+
+
+def _cache_key(documents: list[DocumentTuple], existing_dataset: Dataset | None) -> str:
+    """
+    Fingerprint an extraction request.
+
+    The route (text or vision) isn't known until the text pass, so this
+    covers everything either request is rendered from: the model settings,
+    the system prompt, the rendered existing-data prompt (so template edits
+    invalidate entries), both closing instructions, DEDUP_PAGES (which
+    changes the pages vision sends), and each document's filename (text
+    section headers) and PDF bytes, in order.
+    """
+    # The system prompt is always the static EXTRACTION_PROMPT, hashed from
+    # its bytes encoded once at import
+    _, existing_prompt = create_extraction_prompt_with_existing(
+        existing_dataset,
+        len(documents)
+    )
+
+    hasher = hashlib.blake2b(digest_size=16)
+
+    def add(encoded: bytes) -> None:
+        # Length-prefixed so adjacent parts can't run together
+        hasher.update(len(encoded).to_bytes(8, "little"))
+        hasher.update(encoded)
+
+    add(EXTRACTION_PROMPT_BYTES)
+    for part in (
+        MODEL, str(MAX_TOKENS), str(TEMPERATURE),
+        existing_prompt or "", TEXT_INSTRUCTION, VISION_INSTRUCTION
+    ):
+        add(part.encode())
+    add(b"1" if settings().dedup_pages else b"0")
+    for filename, pdf_bytes in documents:
+        add(filename.encode())
+        hasher.update(hashlib.blake2b(pdf_bytes, digest_size=16).digest())
+    return hasher.hexdigest()
+
+
+def _load_cached_extraction(key: str) -> tuple[str, Dataset] | None:
+    """Return a previously cached (extraction method, result), if any."""
+    cache_path = CACHE_DIR / f"{key}.json"
+
+    if not cache_path.exists():
+        return None
+
+    try:
+        with open(cache_path, 'r') as f:
+            entry = json.load(f)
+        return entry["method"], entry["result"]
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable extraction cache entry {key}: {e}")
+        return None
+
+
+def _save_cached_extraction(key: str, method: str, result: Dataset) -> None:
+    """Persist an extraction result, and the method that produced it, for re-runs."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_path = CACHE_DIR / f"{key}.json"
+
+        # Write beside the entry and rename over it, so a concurrent run or
+        # an interrupted write never leaves a truncated entry behind
+        temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump({"method": method, "result": result}, f, indent=2)
+            os.replace(temp_path, cache_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+    except Exception as e:
+        # Non-fatal: caching is an optimization only
+        logger.warning(f"Failed to cache extraction result {key}: {e}")
+
+
+def _extract_and_assess(index: int, filename: str, pdf_bytes: bytes) -> tuple[int, str, bool, str | None, bool]:
+    """
+    Extract text from one PDF and assess its quality.
+
+    Module-level so it can be pickled into ProcessPoolExecutor workers.
+
+    Returns:
+        Tuple of (input index, filename, is_valid_pdf, extracted text, is_good_quality)
+    """
+    is_valid, text = extract_text_with_validity(pdf_bytes)
+    return index, filename, is_valid, text, bool(text and assess_text_quality(text))
+
+
+@functools.cache
+def _text_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for PDF text extraction, shared by every extraction.
+
+    Started on first use and kept for the life of the process, so batch runs
+    don't start (and re-import into) a pool per property, and concurrent
+    properties share one CPU-sized set of workers.
+
+    First use is usually on an asyncio.to_thread worker, so the process is
+    already multi-threaded: workers come from a forkserver (spawn where
+    that's unavailable) rather than a fork of this process.
+    """
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context(start_method)
+    )
+
+
+async def _discard(task: asyncio.Task) -> None:
+    """
+    Cancel a speculative request and wait for it to finish.
+
+    Awaiting lets the client call unwind and retrieves the task's outcome,
+    which is thrown away (it may already have failed, or been cancelled).
+    """
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError, Exception):
+        await task
+
+
 class TaxDataExtractor:
     """Extract tax data using hybrid text/vision approach for cost optimization."""
 
     def __init__(self):
-        self.client = Anthropic(api_key=ANTHROPIC_API_KEY)
+        self.client = get_client()
         self.text_extraction_count = 0
         self.vision_extraction_count = 0
 
+    @property
+    def aclient(self) -> AsyncAnthropic:
+        """Async client shared by all extractions on the running event loop."""
+        return get_async_client()
+
     def extract(
         self,
         documents: list[DocumentTuple],
@@ -27,6 +250,7 @@ class TaxDataExtractor:
         Extract data from property tax documents using hybrid approach.
 
         Strategy:
+        0. Reuse the cached result if these exact documents were seen before
         1. Try text extraction for each document
         2. If all documents have good text → use text-only Claude (cheaper)
         3. If any document has poor text → use vision Claude (robust)
@@ -40,101 +264,284 @@ class TaxDataExtractor:
         """
         logger.info(f"Extracting data from {len(documents)} document(s)")
 
-        # Attempt text extraction from all documents
-        extracted_texts = []
-        all_text_good = True
+        cache_key, cached = self._check_cache(documents, existing_dataset)
+        if cached is not None:
+            return cached
 
-        for filename, pdf_bytes in documents:
-            text = extract_text_from_pdf(pdf_bytes)
-
-            if text and assess_text_quality(text):
-                extracted_texts.append(f"=== {filename} ===\n{text}")
-                logger.info(f" {filename}: Good text extraction")
-            else:
-                all_text_good = False
-                logger.info(f" {filename}: Poor/no text, will use vision")
-                break  # Stop checking, we'll use vision
+        combined_text, text_count, validity = self._assess_documents(documents)
 
         # Route to appropriate extraction method
-        if all_text_good and extracted_texts:
-            result = self._extract_from_text(extracted_texts, existing_dataset)
+        if combined_text is not None:
+            result = self._extract_from_text(combined_text, text_count, existing_dataset)
+            method = "text"
             self.text_extraction_count += 1
             logger.info(" Used text-only extraction (cost-efficient)")
         else:
-            result = self._extract_from_vision(documents, existing_dataset)
+            valid_documents = self._filter_valid_documents(documents, validity)
+            result = self._extract_from_vision(valid_documents, existing_dataset)
+            method = "vision"
             self.vision_extraction_count += 1
             logger.info(" Used vision extraction (robust)")
 
+        if cache_key:
+            _save_cached_extraction(cache_key, method, result)
+
         return result
 
-    def _extract_from_text(
+    async def aextract(
         self,
-        texts: list[str],
+        documents: list[DocumentTuple],
         existing_dataset: Dataset | None = None
     ) -> Dataset:
         """
-        Extract using text-only Claude (cheaper).
+        Async variant of extract() for use from the async agent graph.
+
+        The CPU-bound text pass runs in a worker thread and the Claude call
+        goes through the async client, so concurrent properties overlap
+        their network IO. With SPECULATIVE_EXTRACT enabled, the vision
+        request is fired before the text pass finishes and cancelled if
+        every document turns out to have good text.
 
         Args:
-            texts: List of extracted text strings
+            documents: List of (filename, pdf_bytes) tuples
             existing_dataset: Optional partial dataset from previous processing
 
         Returns:
             Extracted dataset as dict
         """
-        combined_text = "\n\n".join(texts)
+        logger.info(f"Extracting data from {len(documents)} document(s)")
 
-        # Use appropriate prompt based on whether we have existing data
-        system_prompt = create_extraction_prompt_with_existing(
-            existing_dataset,
-            len(texts)
-        )
+        cache_key, cached = self._check_cache(documents, existing_dataset)
+        if cached is not None:
+            return cached
+
+        speculative = None
+        if settings().speculative_extract:
+            # Vision only needs the PDF bytes, so it can overlap the text pass.
+            # The PDFs aren't opened first: the text pass parses every one it
+            # reaches anyway, and its validity decides below whether this
+            # request stands
+            speculative_documents = documents
+            if settings().dedup_pages:
+                speculative_documents = await asyncio.to_thread(dedupe_pdf_pages, documents)
+            speculative = asyncio.create_task(
+                self._aextract_from_vision(speculative_documents, existing_dataset)
+            )
 
-        # Use standard text API (much cheaper than vision)
         try:
-            response = self.client.messages.create(
-                model=MODEL,
-                max_tokens=MAX_TOKENS,
-                temperature=TEMPERATURE,
-                system=system_prompt,
-                messages=[{
-                    "role": "user",
-                    "content": f"Here are the tax documents in text format:\n\n{combined_text}\n\nPlease extract the dataset."
-                }]
+            combined_text, text_count, validity = await asyncio.to_thread(
+                self._assess_documents, documents
             )
+        except BaseException:
+            if speculative:
+                await _discard(speculative)
+            raise
 
-            result = self._parse_response(response.content[0].text)
-            logger.info(" Text-only extraction successful")
-
-            # Log token usage
-            logger.info(
-                f"Token usage - Input: {response.usage.input_tokens}, "
-                f"Output: {response.usage.output_tokens}"
-            )
+        # Route to appropriate extraction method
+        if combined_text is not None:
+            if speculative:
+                logger.info(" Cancelling speculative vision request")
+                await _discard(speculative)
+            result = await self._aextract_from_text(combined_text, text_count, existing_dataset)
+            method = "text"
+            self.text_extraction_count += 1
+            logger.info(" Used text-only extraction (cost-efficient)")
+        else:
+            if speculative and not all(validity.values()):
+                # It was sent a PDF the text pass couldn't open
+                logger.info(" Re-sending vision request without invalid PDF(s)")
+                await _discard(speculative)
+                speculative = None
+
+            if speculative:
+                try:
+                    result = await speculative
+                except BadRequestError:
+                    if len(validity) == len(documents):
+                        raise
+                    # Documents the text pass never reached weren't checked;
+                    # retry with them opened and filtered
+                    logger.warning(" Speculative vision request rejected, retrying with checked PDFs")
+                    speculative = None
+
+            if not speculative:
+                # May open PDFs (under the PDFium lock): keep it off the loop
+                valid_documents = await asyncio.to_thread(
+                    self._filter_valid_documents, documents, validity
+                )
+                result = await self._aextract_from_vision(valid_documents, existing_dataset)
+            method = "vision"
+            self.vision_extraction_count += 1
+            logger.info(" Used vision extraction (robust)")
 
-            return result
+        if cache_key:
+            _save_cached_extraction(cache_key, method, result)
 
-        except Exception as e:
-            logger.error(f"Text extraction failed: {e}")
-            raise
+        return result
 
-    def _extract_from_vision(
+    def _check_cache(
         self,
         documents: list[DocumentTuple],
-        existing_dataset: Dataset | None = None
-    ) -> Dataset:
+        existing_dataset: Dataset | None
+    ) -> tuple[str | None, Dataset | None]:
         """
-        Extract using Claude vision (more expensive, more robust).
+        Look up a cached result for these exact documents.
 
-        Args:
-            documents: List of (filename, pdf_bytes) tuples
-            existing_dataset: Optional partial dataset from previous processing
+        A hit counts towards the method that originally produced it, so
+        extraction stats (and the reported method) match an uncached run.
 
         Returns:
-            Extracted dataset as dict
+            Tuple of (cache key or None if caching is disabled, cached result or None)
+        """
+        if settings().extract_no_cache:
+            return None, None
+
+        cache_key = _cache_key(documents, existing_dataset)
+        cached = _load_cached_extraction(cache_key)
+        if cached is None:
+            return cache_key, None
+
+        # Short-circuit re-runs on identical documents
+        method, result = cached
+        if method == "text":
+            self.text_extraction_count += 1
+        else:
+            self.vision_extraction_count += 1
+        logger.info(" Using cached extraction result ({})", method)
+        return cache_key, result
+
+    def _assess_documents(
+        self,
+        documents: list[DocumentTuple]
+    ) -> tuple[str | None, int, dict[int, bool]]:
+        """
+        Extract and quality-check text from every document.
+
+        PDFium parsing is CPU-bound, so several documents fan out across the
+        shared process pool; the first poor result cancels the rest. A single
+        document (or a single CPU) is parsed inline, where PDFium's
+        thread-safety lock in document_loader serializes it against other
+        threads.
+
+        Returns:
+            Tuple of (combined text if every document has good text else None,
+            number of documents in the combined text,
+            PDF validity keyed by document index for documents that were parsed)
+        """
+        if len(documents) == 1 or (os.cpu_count() or 1) == 1:
+            # Nothing to parallelize: parse inline, stopping at the first poor document
+            results = []
+            for i, (filename, pdf_bytes) in enumerate(documents):
+                results.append(_extract_and_assess(i, filename, pdf_bytes))
+                if not results[-1][4]:
+                    break
+        else:
+            futures = [
+                _text_pool().submit(_extract_and_assess, i, filename, pdf_bytes)
+                for i, (filename, pdf_bytes) in enumerate(documents)
+            ]
+            for future in as_completed(futures):
+                if not future.result()[4]:
+                    # Stop checking, we'll use vision
+                    for pending in futures:
+                        pending.cancel()
+                    break
+            results = [f.result() for f in futures if not f.cancelled()]
+
+        validity = {index: is_valid for index, _, is_valid, _, _ in results}
+
+        text_buffer = io.StringIO()
+        text_count = 0
+
+        # Preserve original document ordering
+        for _, filename, _, text, is_good in sorted(results):
+            if not is_good:
+                logger.info(f" {filename}: Poor/no text, will use vision")
+                return None, 0, validity
+
+            # Write straight into one buffer rather than building per-doc strings
+            if text_count:
+                text_buffer.write("\n\n")
+            text_buffer.write("=== ")
+            text_buffer.write(filename)
+            text_buffer.write(" ===\n")
+            text_buffer.write(text)
+            text_count += 1
+            logger.info(f" {filename}: Good text extraction")
+
+        if not text_count:
+            return None, 0, validity
+
+        return text_buffer.getvalue(), text_count, validity
+
+    def _filter_valid_documents(
+        self,
+        documents: list[DocumentTuple],
+        validity: dict[int, bool]
+    ) -> list[DocumentTuple]:
         """
+        Drop PDFs that cannot be opened before sending them to Claude.
+
+        Reuses the text pass's parse as the validity check; only documents
+        it never reached (cancelled early) need to be opened again. With
+        DEDUP_PAGES enabled, repeated pages are stripped as well.
+        """
+        valid_documents = []
+        for index, (filename, pdf_bytes) in enumerate(documents):
+            is_valid = validity[index] if index in validity else is_valid_pdf(pdf_bytes)
+            if not is_valid:
+                logger.warning(f"Skipping invalid/corrupted PDF {filename}")
+                logger.warning("This may result in incomplete extraction")
+                continue
+            valid_documents.append((filename, pdf_bytes))
+
+        if settings().dedup_pages:
+            valid_documents = dedupe_pdf_pages(valid_documents)
+
+        return valid_documents
+
+    def _text_request(
+        self,
+        combined_text: str,
+        doc_count: int,
+        existing_dataset: Dataset | None
+    ) -> dict:
+        """Build messages.create arguments for text-only extraction."""
+        # Use appropriate prompt based on whether we have existing data
+        system_prompt, existing_prompt = create_extraction_prompt_with_existing(
+            existing_dataset,
+            doc_count
+        )
+
+        content = []
+        if existing_prompt:
+            content.append({"type": "text", "text": existing_prompt})
+        content.append({
+            "type": "text",
+            "text": TEXT_INSTRUCTION.format(combined_text)
+        })
+        logger.opt(lazy=True).debug(
+            "Estimated input tokens: ~{}",
+            lambda: estimate_prompt_tokens(*(block["text"] for block in content))
+        )
+
+        # Use standard text API (much cheaper than vision)
+        return {
+            "model": MODEL,
+            "max_tokens": MAX_TOKENS,
+            "temperature": TEMPERATURE,
+            "system": _cached_system(system_prompt),
+            "messages": [{"role": "user", "content": content}]
+        }
+
+    def _vision_request(
+        self,
+        documents: list[DocumentTuple],
+        existing_dataset: Dataset | None
+    ) -> dict:
+        """Build messages.create arguments for vision extraction."""
         # Use appropriate prompt based on whether we have existing data
-        system_prompt = create_extraction_prompt_with_existing(
+        system_prompt, existing_prompt = create_extraction_prompt_with_existing(
             existing_dataset,
             len(documents)
         )
@@ -143,57 +550,137 @@ class TaxDataExtractor:
         content = []
 
         for filename, pdf_bytes in documents:
-            # Validate PDF before sending
-            try:
-                from pypdf import PdfReader
-                import io
-                # Quick validation - try to read the PDF
-                PdfReader(io.BytesIO(pdf_bytes))
-            except Exception as e:
-                logger.warning(f"Skipping invalid/corrupted PDF {filename}: {e}")
-                logger.warning(f"This may result in incomplete extraction")
-                continue
-
             # Claude can read PDFs directly
             content.append({
                 "type": "document",
                 "source": {
                     "type": "base64",
                     "media_type": "application/pdf",
-                    "data": base64.standard_b64encode(pdf_bytes).decode('utf-8')
+                    "data": base64.b64encode(pdf_bytes).decode('ascii')
                 }
             })
 
-        # Add instruction
+        # Add existing data (if any) and instruction
+        if existing_prompt:
+            content.append({"type": "text", "text": existing_prompt})
         content.append({
             "type": "text",
-            "text": "Please extract the tax dataset from these documents."
+            "text": VISION_INSTRUCTION
         })
 
-        # Call Claude with vision
+        return {
+            "model": MODEL,
+            "max_tokens": MAX_TOKENS,
+            "temperature": TEMPERATURE,
+            "system": _cached_system(system_prompt),
+            "messages": [{"role": "user", "content": content}]
+        }
+
+    def _handle_response(self, response, label: str) -> Dataset:
+        """Parse a Claude response and log token usage."""
+        if not response.content:
+            logger.error("API returned empty content!")
+            raise ValueError("API response has no content")
+
+        result = self._parse_response(response.content[0].text)
+        logger.info(f" {label} extraction successful")
+
+        # Shape check only; business rules are left to the validate node
         try:
-            response = self.client.messages.create(
-                model=MODEL,
-                max_tokens=MAX_TOKENS,
-                temperature=TEMPERATURE,
-                system=system_prompt,
-                messages=[{"role": "user", "content": content}]
-            )
+            validate_extraction(result)
+        except fastjsonschema.JsonSchemaException as e:
+            logger.warning(f"Extraction does not match output schema: {e.message}")
+
+        # Log token usage
+        logger.info(
+            f"Token usage - Input: {response.usage.input_tokens}, "
+            f"Output: {response.usage.output_tokens}"
+        )
+
+        return result
+
+    def _extract_from_text(
+        self,
+        combined_text: str,
+        doc_count: int,
+        existing_dataset: Dataset | None = None
+    ) -> Dataset:
+        """
+        Extract using text-only Claude (cheaper).
 
-            if not response.content:
-                logger.error("API returned empty content!")
-                raise ValueError("API response has no content")
+        Args:
+            combined_text: Extracted text of all documents, with per-file headers
+            doc_count: Number of documents in combined_text
+            existing_dataset: Optional partial dataset from previous processing
 
-            result = self._parse_response(response.content[0].text)
-            logger.info(" Vision extraction successful")
+        Returns:
+            Extracted dataset as dict
+        """
+        request = self._text_request(combined_text, doc_count, existing_dataset)
 
-            # Log token usage
-            logger.info(
-                f"Token usage - Input: {response.usage.input_tokens}, "
-                f"Output: {response.usage.output_tokens}"
-            )
+        try:
+            response = self.client.messages.create(**request)
+            return self._handle_response(response, "Text-only")
+
+        except Exception as e:
+            logger.error(f"Text extraction failed: {e}")
+            raise
+
+    async def _aextract_from_text(
+        self,
+        combined_text: str,
+        doc_count: int,
+        existing_dataset: Dataset | None = None
+    ) -> Dataset:
+        """Async variant of _extract_from_text()."""
+        request = self._text_request(combined_text, doc_count, existing_dataset)
+
+        try:
+            response = await self.aclient.messages.create(**request)
+            return self._handle_response(response, "Text-only")
+
+        except Exception as e:
+            logger.error(f"Text extraction failed: {e}")
+            raise
+
+    def _extract_from_vision(
+        self,
+        documents: list[DocumentTuple],
+        existing_dataset: Dataset | None = None
+    ) -> Dataset:
+        """
+        Extract using Claude vision (more expensive, more robust).
+
+        Args:
+            documents: List of (filename, pdf_bytes) tuples, already checked as valid PDFs
+            existing_dataset: Optional partial dataset from previous processing
+
+        Returns:
+            Extracted dataset as dict
+        """
+        request = self._vision_request(documents, existing_dataset)
+
+        # Call Claude with vision
+        try:
+            response = self.client.messages.create(**request)
+            return self._handle_response(response, "Vision")
+
+        except Exception as e:
+            logger.error(f"Vision extraction failed: {e}")
+            raise
 
-            return result
+    async def _aextract_from_vision(
+        self,
+        documents: list[DocumentTuple],
+        existing_dataset: Dataset | None = None
+    ) -> Dataset:
+        """Async variant of _extract_from_vision()."""
+        request = self._vision_request(documents, existing_dataset)
+
+        # Call Claude with vision
+        try:
+            response = await self.aclient.messages.create(**request)
+            return self._handle_response(response, "Vision")
 
         except Exception as e:
             logger.error(f"Vision extraction failed: {e}")
@@ -212,23 +699,21 @@ class TaxDataExtractor:
         Raises:
             ValueError: If response is not valid JSON
         """
-        # Remove markdown code blocks if present
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0]
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0]
-
         try:
-            return json.loads(text.strip())
-        except json.JSONDecodeError as e:
+            return parse_extraction_response(text)
+        except ValueError as e:
             logger.error(f"Failed to parse JSON: {e}")
-            logger.debug(f"Raw response: {text[:500]}")
+            logger.opt(lazy=True).debug("Raw response: {}", lambda: text[:500])
             raise ValueError("Claude did not return valid JSON")
 
     def get_extraction_stats(self) -> dict[str, int | float]:
         """
         Return statistics on extraction method usage.
 
+        Counters are only bumped in the owning process (pool workers just
+        assess text), and async batch runs share one event-loop thread, so
+        plain ints already aggregate a whole batch without locking.
+
         Returns:
             Dict with extraction statistics
         """
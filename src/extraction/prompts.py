@@ -1,10 +1,16 @@
 """Prompt templates for tax data extraction."""
-import json
+import functools
+import re
+from typing import TYPE_CHECKING, Final
 
-from src.state import Dataset
+import fastjsonschema
+import orjson
 
+if TYPE_CHECKING:
+    from src.state import Dataset
 
-EXTRACTION_PROMPT = """SYSTEM PURPOSE
+
+EXTRACTION_PROMPT: Final[str] = """SYSTEM PURPOSE
 You are a vision+text extractor that reads property tax documents and outputs a single JSON object. Follow the deterministic rules exactly. Do your reasoning silently and return ONLY the final JSON.
 
 ANCHORS
@@ -40,8 +46,6 @@ Then you MUST use this extraction logic (ignoring general document priority):
 **KEY INSIGHT - DIFFERENT TAX YEARS**:
 - When documents discuss DIFFERENT TAX YEARS (e.g., official doc shows "2024 PAID" and lender shows "June 2025 UNPAID"), these are NOT conflicting information about the same tax year - they are separate tax years.
 - DO NOT dismiss the lender document as "outdated" just because the official document has a more recent document date.
-- The lender document is providing information about a MORE CURRENT TAX YEAR (2025) than the official document (2024).
-- Extract the tax year and amounts that represent CURRENT UNPAID OBLIGATIONS (2025), not fully paid historical years (2024).
 - Example: Official county doc dated 10/5/25 shows "2024 tax year PAID $0", Lender doc shows "June 2025 taxes $1,118.23 UNPAID" → Extract taxYear="2025", amountDueAtClosing=$1,118.23 (NOT taxYear="2024", amountDueAtClosing=$0.00)
 
 DOCUMENT PRIORITY & MERGE (general - apply AFTER checking for CRITICAL SCENARIO above)
@@ -51,12 +55,6 @@ DOCUMENT PRIORITY & MERGE (general - apply AFTER checking for CRITICAL SCENARIO
 
 DATE-SOURCE OVERRIDE (applies ONLY to next/following dates)
 - Default: prefer dates from more official documents.
-
-
-
-
-
-
 - Override: if a less-official document has a CLEARLY MORE RECENT document date/revision/issue timestamp than the official one, USE THE LESS-OFFICIAL DOCUMENT'S DATES.
 
 FIELD RULES (deterministic)
@@ -170,35 +168,82 @@ OUTPUT
 - IMPORTANT: Include the _dateSelectionReasoning field with detailed explanation of date selection.
 """
 
+# Encoded once for callers that hash or send the prompt as bytes
+EXTRACTION_PROMPT_BYTES: Final[bytes] = EXTRACTION_PROMPT.encode("utf-8")
 
-def create_extraction_prompt_with_existing(
-    existing_dataset: Dataset | None,
-    doc_count: int
-) -> str:
+# Rough token count (~4 chars/token) of the static prefix, computed once
+EXTRACTION_PROMPT_TOKEN_ESTIMATE: Final[int] = len(EXTRACTION_PROMPT) // 4
+
+
+def estimate_prompt_tokens(*user_texts: str) -> int:
     """
-    Create an extraction prompt that handles existing partial data.
+    Estimate input tokens for a request, without re-counting the system prompt.
 
     Args:
-        existing_dataset: Previously extracted partial data (if any)
-        doc_count: Number of new documents being processed
+        user_texts: Variable text sent alongside EXTRACTION_PROMPT
 
     Returns:
-        Formatted prompt string
+        Approximate token count (not a tokenizer-exact figure)
     """
-    if not existing_dataset:
-        return EXTRACTION_PROMPT
+    return EXTRACTION_PROMPT_TOKEN_ESTIMATE + sum(len(text) for text in user_texts) // 4
+
+
+# Mirror of the SCHEMA block above, for checking what Claude returns
+_DATE_OR_NULL = {"type": ["string", "null"], "pattern": r"^\d{4}-\d{2}-\d{2}$"}
+_OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "taxYear": {"type": ["string", "null"], "pattern": r"^\d{4}$"},
+        "annualizedAmountDue": {"type": ["number", "null"]},
+        "amountDueAtClosing": {"type": ["number", "null"]},
+        "county": {"type": ["string", "null"]},
+        "parcelNumber": {"type": ["string", "null"]},
+        "nextTaxPaymentDate": _DATE_OR_NULL,
+        "followingTaxPaymentDate": _DATE_OR_NULL,
+        "propertyAddress": {"type": ["string", "null"]},
+        "_dateSelectionReasoning": {"type": ["string", "null"]}
+    },
+    "required": [
+        "taxYear",
+        "annualizedAmountDue",
+        "amountDueAtClosing",
+        "county",
+        "parcelNumber",
+        "nextTaxPaymentDate",
+        "followingTaxPaymentDate"
+    ]
+}
 
-    existing_json = json.dumps(existing_dataset, indent=2)
+# Compiled once at import; raises fastjsonschema.JsonSchemaException on failure
+validate_extraction = fastjsonschema.compile(_OUTPUT_SCHEMA)
 
-    return f"""You are analyzing property tax documents WITH existing partial data.
 
-EXISTING DATA (may be incomplete):
-{existing_json}
+# First fenced block in a response (unterminated fences run to the end)
+_JSON_FENCE = re.compile(r"```json(.*?)(?:```|\Z)", re.S)
+_ANY_FENCE = re.compile(r"```(.*?)(?:```|\Z)", re.S)
 
-NEW DOCUMENTS:
-{doc_count} new document(s) provided for analysis.
 
-YOUR TASK:
+def parse_extraction_response(text: str) -> dict:
+    """
+    Parse the JSON object from a Claude response.
+
+    Args:
+        text: Response text, optionally wrapped in a markdown code block
+
+    Returns:
+        Parsed JSON as dict
+
+    Raises:
+        orjson.JSONDecodeError: If the response is not valid JSON
+    """
+    match = _JSON_FENCE.search(text) or _ANY_FENCE.search(text)
+    if match:
+        text = match.group(1)
+    return orjson.loads(text.strip())
+
+
+# Static half of the merge-path user prompt, built once at import
+_MERGE_INSTRUCTIONS = """YOUR TASK:
 1. Extract the 7 required fields from the new documents
 2. Compare with existing data
 3. Determine if new documents:
@@ -222,11 +267,60 @@ MERGING RULES:
    - Always prefer most recent, most complete information from the highest priority source
    - For dates: use the most recent payment schedule from official sources
 
-**CRITICAL**: You MUST return ONLY valid JSON. Do NOT include any explanations, commentary, or conversational text.
-Return the JSON object immediately without any preamble.
-
-{EXTRACTION_PROMPT.split('SCHEMA (fixed keys)')[1]}
-
-**REMINDER**: Your response must be ONLY the JSON object shown in the OUTPUT FORMAT above.
+**REMINDER**: Your response must be ONLY the JSON object described in the OUTPUT section of your instructions.
 Do NOT start with phrases like "Looking at these documents" or "I can see".
 Return pure JSON only."""
+
+# Full merge-path user prompt; only the two placeholders are filled per call
+# (so _MERGE_INSTRUCTIONS must not contain literal braces)
+_MERGE_TEMPLATE = """You are analyzing property tax documents WITH existing partial data.
+
+EXISTING DATA (may be incomplete):
+{existing_json}
+
+NEW DOCUMENTS:
+{doc_count} new document(s) provided for analysis.
+
+""" + _MERGE_INSTRUCTIONS
+
+
+@functools.lru_cache(maxsize=128)
+def _render_with_existing(existing_json: str, doc_count: int) -> str:
+    """
+    Render the merge-path user prompt.
+
+    Keyed on the serialized dataset, so retries and re-runs over the same
+    snapshot reuse the rendered string.
+    """
+    return _MERGE_TEMPLATE.format_map({"existing_json": existing_json, "doc_count": doc_count})
+
+
+def create_extraction_prompt_with_existing(
+    existing_dataset: "Dataset | None",
+    doc_count: int
+) -> tuple[str, str | None]:
+    """
+    Create extraction prompts that handle existing partial data.
+
+    The system prompt is always the static EXTRACTION_PROMPT so it can be
+    served from the prompt cache; existing data goes in the user turn.
+
+    Args:
+        existing_dataset: Previously extracted partial data, or None if
+            there is none
+        doc_count: Number of new documents being processed
+
+    Returns:
+        Tuple of (system prompt, user prompt with existing data or None)
+    """
+    # Nothing to merge: no prior values, or no new documents to merge in
+    # (0 and "" are real values, so only an all-None dataset counts as empty)
+    if existing_dataset is None or doc_count == 0 or all(
+        value is None for value in existing_dataset.values()
+    ):
+        return EXTRACTION_PROMPT, None
+
+    existing_json = orjson.dumps(existing_dataset, option=orjson.OPT_INDENT_2).decode()
+
+    return EXTRACTION_PROMPT, _render_with_existing(existing_json, doc_count)
+
@@ -1,11 +1,18 @@
 """CLI entry point for the tax certificate extraction agent."""
 import typer
-import json
+import csv
+import functools
+import io
+import os
+import re
+import stat
+import sys
+import threading
 from pathlib import Path
+import orjson
 from loguru import logger
 
 from src.utils.logging_config import configure_logging
-from src.agent.graph import run_extraction_agent
 from src.tools.dataset_tools import get_all_property_ids, search_properties
 from src.state import AgentState
 
@@ -15,6 +22,10 @@ app = typer.Typer(
 )
 
 
+# Last underscore-separated part of a filename, minus any .zip extension
+_PROPERTY_ID_RE = re.compile(r'(?:.*_)?([^_]*?)(?:\.zip)?$', re.S)
+
+
 def _extract_property_id(filename: str) -> str:
     """
     Extract the numeric property ID from a filename.
@@ -27,15 +38,108 @@ def _extract_property_id(filename: str) -> str:
 
     Returns just the numeric ID: 1760629325007
     """
-    # Remove .zip extension if present
-    name = filename.replace('.zip', '')
+    # One anchored match strips the prefix and extension (always matches)
+    return _PROPERTY_ID_RE.match(filename).group(1)
+
+
+def _import_agent() -> None:
+    try:
+        import src.agent.graph  # noqa: F401
+    except Exception:
+        pass  # Re-raised by the command's own import
+
+
+def _prewarm_agent() -> None:
+    """
+    Start importing the agent graph in the background.
+
+    The import (LangGraph, Anthropic, PDF backends) takes over a second;
+    this overlaps it with prompts and directory scans, and the command's
+    later import just waits for it to finish.
+    """
+    threading.Thread(target=_import_agent, name="agent-import", daemon=True).start()
+
+
+def _configure_unzip(backend: str | None) -> None:
+    """Apply a --unzip-backend choice, exiting with an error if it is unusable."""
+    if backend is None:
+        return
+
+    from src.tools.document_loader import set_unzip_backend
+
+    try:
+        set_unzip_backend(backend.lower())
+    except (ValueError, ImportError) as e:
+        typer.echo(f" Error: {e}", err=True)
+        raise typer.Exit(1)
+
+
+def _dumps(obj) -> str:
+    """Pretty-print JSON for display (2-space indent, like json.dumps(indent=2))."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
 
-    # If the name contains underscores, take the last part
-    if '_' in name:
-        return name.split('_')[-1]
+# Official schema fields (user-visible)
+VISIBLE_FIELDS = frozenset({
+    "taxYear",
+    "annualizedAmountDue",
+    "amountDueAtClosing",
+    "nextTaxPaymentDate",
+    "followingTaxPaymentDate",
+    "county",
+    "parcelNumber"
+})
+
+
+def _stat_or_none(path: Path) -> os.stat_result | None:
+    """Stat a path in one syscall, returning None if it doesn't exist."""
+    try:
+        return path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _list_zip_files(dir_path: str | Path) -> list[Path]:
+    """
+    List zip files in a directory, sorted by name.
+
+    One scandir pass; the directory entries already say which are files.
+    """
+    with os.scandir(dir_path) as entries:
+        return sorted(
+            (
+                Path(entry.path) for entry in entries
+                if entry.name.endswith('.zip') and entry.is_file()
+            ),
+            key=lambda path: path.name
+        )
+
+
+@functools.lru_cache(maxsize=1)
+def _index_tax_certs(dir_path: str, mtime_ns: int) -> dict[str, Path]:
+    """
+    Map property ID to zip path for every zip in a directory.
+
+    Built with one scandir pass and cached per (directory, mtime), so it is
+    rebuilt only when zips are added or removed.
+    """
+    return {_extract_property_id(path.name): path for path in _list_zip_files(dir_path)}
+
+
+def _find_zip_file(tax_certs_dir: Path, property_name: str) -> Path | None:
+    """
+    Find the zip file for a property name or ID.
+
+    Tries an exact property ID match first, then any zip whose filename
+    contains the name.
+    """
+    index = _index_tax_certs(str(tax_certs_dir), tax_certs_dir.stat().st_mtime_ns)
 
-    # Otherwise, return as-is (already simplified)
-    return name
+    zip_file = index.get(property_name)
+    if zip_file:
+        return zip_file
+
+    return next((path for path in index.values() if property_name in path.name), None)
 
 
 def _get_user_visible_dataset(dataset: dict) -> dict:
@@ -45,18 +149,8 @@ def _get_user_visible_dataset(dataset: dict) -> dict:
     Internal fields like propertyAddress are used for search but not shown to users.
     Only the 7 official schema fields are displayed.
     """
-    # Official schema fields (user-visible)
-    visible_fields = [
-        "taxYear",
-        "annualizedAmountDue",
-        "amountDueAtClosing",
-        "nextTaxPaymentDate",
-        "followingTaxPaymentDate",
-        "county",
-        "parcelNumber"
-    ]
-
-    return {k: v for k, v in dataset.items() if k in visible_fields}
+    # Iterate the dataset (not a set intersection) to keep its field order
+    return {k: v for k, v in dataset.items() if k in VISIBLE_FIELDS}
 
 
 def display_results(property_id: str, final_state: AgentState, show_dataset: bool = True) -> None:
@@ -67,25 +161,25 @@ def display_results(property_id: str, final_state: AgentState, show_dataset: boo
 
     # Show dataset (filtered to user-visible fields only)
     if show_dataset:
-        dataset = final_state['final_dataset']
+        dataset = final_state.final_dataset
         visible_dataset = _get_user_visible_dataset(dataset)
         typer.echo("\n Extracted Data:")
-        typer.echo(json.dumps(visible_dataset, indent=2))
+        typer.echo(_dumps(visible_dataset))
 
     # Show validation errors if any
-    if final_state['validation_issues']:
+    if final_state.validation_issues:
         typer.echo("\n  Validation Warnings:")
-        for issue in final_state['validation_issues']:
+        for issue in final_state.validation_issues:
             typer.echo(f"  • {issue['message']}")
     else:
         typer.echo("\n No validation issues")
 
     # Show processing info
     typer.echo("\n Processing Info:")
-    typer.echo(f"  • Documents: {len(final_state['new_documents'])}")
-    if final_state['extraction_method']:
-        method_emoji = "" if final_state['extraction_method'] == 'text' else ""
-        typer.echo(f"  • Method: {method_emoji} {final_state['extraction_method']}-based extraction")
+    typer.echo(f"  • Documents: {len(final_state.new_documents)}")
+    if final_state.extraction_method:
+        method_emoji = "" if final_state.extraction_method == 'text' else ""
+        typer.echo(f"  • Method: {method_emoji} {final_state.extraction_method}-based extraction")
 
     output_path = Path("output") / "datasets" / f"{property_id}.json"
     typer.echo(f"  • Saved to: {output_path}")
@@ -95,6 +189,10 @@ def display_results(property_id: str, final_state: AgentState, show_dataset: boo
 def extract(
     property_name: str | None = typer.Option(None, "--name", "-n", help="Property name/ID"),
     zip_file: Path | None = typer.Option(None, "--zip", "-z", help="Path to property zip file"),
+    unzip_backend: str | None = typer.Option(
+        None, "--unzip-backend",
+        help="Zip inflate backend: auto, stdlib, isal, zlib-ng (default: UNZIP_BACKEND or auto)"
+    ),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Show detailed processing logs"),
     log_file: str | None = typer.Option(None, "--log-file", help="Save logs to file"),
 ) -> None:
@@ -103,6 +201,8 @@ def extract(
     # Configure logging - suppress console unless verbose
     log_level = "INFO" if verbose else "ERROR"
     configure_logging(level=log_level, log_file=log_file)
+    _configure_unzip(unzip_backend)
+    _prewarm_agent()
 
     # Interactive mode: prompt for property name if not provided
     if not property_name and not zip_file:
@@ -112,9 +212,8 @@ def extract(
         # Auto-find zip file
         tax_certs_dir = Path("tax_certificates")
         if tax_certs_dir.exists():
-            matching_files = list(tax_certs_dir.glob(f"*{property_name}*.zip"))
-            if matching_files:
-                zip_file = matching_files[0]
+            zip_file = _find_zip_file(tax_certs_dir, property_name)
+            if zip_file:
                 typer.echo(f" Found: {zip_file.name}\n")
             else:
                 zip_file = Path(typer.prompt("Enter path to zip file"))
@@ -125,9 +224,8 @@ def extract(
     if property_name and not zip_file:
         tax_certs_dir = Path("tax_certificates")
         if tax_certs_dir.exists():
-            matching_files = list(tax_certs_dir.glob(f"*{property_name}*.zip"))
-            if matching_files:
-                zip_file = matching_files[0]
+            zip_file = _find_zip_file(tax_certs_dir, property_name)
+            if zip_file:
                 typer.echo(f" Found: {zip_file.name}")
             else:
                 typer.echo(f" No zip file found matching '{property_name}' in tax_certificates/", err=True)
@@ -141,7 +239,8 @@ def extract(
         property_name = zip_file.stem
 
     # Validate zip file exists
-    if not zip_file.exists():
+    zip_stat = _stat_or_none(zip_file)
+    if zip_stat is None or not stat.S_ISREG(zip_stat.st_mode):
         typer.echo(f" Error: Zip file not found: {zip_file}", err=True)
         raise typer.Exit(1)
 
@@ -150,6 +249,9 @@ def extract(
 
     typer.echo(" Processing...\n")
 
+    # Deferred: pulls in LangGraph, Anthropic and PDF backends
+    from src.agent.graph import run_extraction_agent
+
     try:
         # Run the agent
         final_state = run_extraction_agent(
@@ -170,6 +272,10 @@ def extract(
 def process(
     zip_file: Path = typer.Argument(..., help="Path to property zip file"),
     property_id: str | None = typer.Option(None, help="Property ID (defaults to zip filename)"),
+    unzip_backend: str | None = typer.Option(
+        None, "--unzip-backend",
+        help="Zip inflate backend: auto, stdlib, isal, zlib-ng (default: UNZIP_BACKEND or auto)"
+    ),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Show detailed processing logs"),
     log_file: str | None = typer.Option(None, help="Optional log file path"),
 ) -> None:
@@ -178,9 +284,12 @@ def process(
     # Configure logging - suppress console unless verbose
     log_level = "INFO" if verbose else "ERROR"
     configure_logging(level=log_level, log_file=log_file)
+    _configure_unzip(unzip_backend)
+    _prewarm_agent()
 
     # Validate zip file exists
-    if not zip_file.exists():
+    zip_stat = _stat_or_none(zip_file)
+    if zip_stat is None or not stat.S_ISREG(zip_stat.st_mode):
         typer.echo(f" Error: Zip file not found: {zip_file}", err=True)
         raise typer.Exit(1)
 
@@ -191,6 +300,9 @@ def process(
 
     typer.echo(" Processing...\n")
 
+    # Deferred: pulls in LangGraph, Anthropic and PDF backends
+    from src.agent.graph import run_extraction_agent
+
     try:
         # Run the agent
         final_state = run_extraction_agent(
@@ -210,6 +322,14 @@ def process(
 @app.command()
 def batch(
     input_dir: Path = typer.Option("tax_certificates", help="Directory with zip files"),
+    workers: int = typer.Option(
+        min(8, os.cpu_count() or 1), "--workers", "-w", min=1,
+        help="Number of properties to process concurrently"
+    ),
+    unzip_backend: str | None = typer.Option(
+        None, "--unzip-backend",
+        help="Zip inflate backend: auto, stdlib, isal, zlib-ng (default: UNZIP_BACKEND or auto)"
+    ),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Show detailed processing logs"),
     log_file: str | None = typer.Option(None, help="Optional log file path"),
 ) -> None:
@@ -218,14 +338,17 @@ def batch(
     # Configure logging - suppress console unless verbose
     log_level = "INFO" if verbose else "ERROR"
     configure_logging(level=log_level, log_file=log_file)
+    _configure_unzip(unzip_backend)
+    _prewarm_agent()
 
     # Validate input directory
-    if not input_dir.exists() or not input_dir.is_dir():
+    input_stat = _stat_or_none(input_dir)
+    if input_stat is None or not stat.S_ISDIR(input_stat.st_mode):
         typer.echo(f" Error: Input directory not found: {input_dir}", err=True)
         raise typer.Exit(1)
 
     # Find all zip files
-    zip_files = list(input_dir.glob("*.zip"))
+    zip_files = _list_zip_files(input_dir)
 
     if not zip_files:
         typer.echo(f" Error: No zip files found in {input_dir}", err=True)
@@ -233,66 +356,83 @@ def batch(
 
     typer.echo(f" Processing {len(zip_files)} properties...\n")
 
-    # Process each property
-    results = []
-    for i, zip_file in enumerate(zip_files, 1):
-        # Extract simplified property ID from filename
-        property_id = _extract_property_id(zip_file.stem)
+    # Process properties concurrently; results keep input order
+    property_ids = [_extract_property_id(zip_file.stem) for zip_file in zip_files]
+    results = [None] * len(zip_files)
+    completed = 0
 
-        typer.echo(f"[{i}/{len(zip_files)}] {property_id}...", nl=False)
+    def _record(index: int, outcome: AgentState | Exception) -> None:
+        nonlocal completed
+        completed += 1
+        property_id = property_ids[index]
 
-        try:
-            final_state = run_extraction_agent(
-                property_id=property_id,
-                zip_file_path=str(zip_file)
-            )
+        typer.echo(f"[{completed}/{len(zip_files)}] {property_id}...", nl=False)
 
-            results.append({
-                "property_id": property_id,
-                "status": "success",
-                "validation_issues": len(final_state['validation_issues']),
-                "extraction_method": final_state['extraction_method'],
-                "doc_count": len(final_state['new_documents'])
-            })
-
-            typer.echo(f" ")
-
-        except Exception as e:
-            logger.error(f"Failed to process {property_id}: {e}")
-            results.append({
+        if isinstance(outcome, Exception):
+            logger.error(f"Failed to process {property_id}: {outcome}")
+            results[index] = {
                 "property_id": property_id,
                 "status": "failed",
-                "error": str(e)
-            })
-            typer.echo(f"  {e}")
-
-    # Summary
-    typer.echo("\n" + "="*60)
-    typer.echo("BATCH PROCESSING SUMMARY")
-    typer.echo("="*60)
+                "error": str(outcome)
+            }
+            typer.echo(f"  {outcome}")
+            return
 
-    successful = sum(1 for r in results if r['status'] == 'success')
-    failed = sum(1 for r in results if r['status'] == 'failed')
+        results[index] = {
+            "property_id": property_id,
+            "status": "success",
+            "validation_issues": len(outcome.validation_issues),
+            "extraction_method": outcome.extraction_method,
+            "doc_count": len(outcome.new_documents)
+        }
+        typer.echo(f" ")
+
+    # Deferred: pulls in LangGraph, Anthropic and PDF backends
+    from src.agent.graph import run_extraction_agent_batch
+
+    run_extraction_agent_batch(
+        [(property_id, str(zip_file)) for property_id, zip_file in zip(property_ids, zip_files)],
+        max_concurrency=workers,
+        on_complete=_record
+    )
 
-    typer.echo(f"\nTotal properties: {len(results)}")
-    typer.echo(f"   Successful: {successful}")
-    typer.echo(f"   Failed: {failed}")
+    # Summary (built up and emitted in one write)
+    successful = failed = text_count = vision_count = 0
+    for r in results:
+        if r['status'] == 'success':
+            successful += 1
+            method = r['extraction_method']
+            if method == 'text':
+                text_count += 1
+            elif method == 'vision':
+                vision_count += 1
+        else:
+            failed += 1
+
+    lines = [
+        "\n" + "="*60,
+        "BATCH PROCESSING SUMMARY",
+        "="*60,
+        f"\nTotal properties: {len(results)}",
+        f"   Successful: {successful}",
+        f"   Failed: {failed}",
+    ]
 
     # Show extraction method breakdown
     if successful > 0:
-        text_count = sum(1 for r in results if r.get('extraction_method') == 'text')
-        vision_count = sum(1 for r in results if r.get('extraction_method') == 'vision')
-
-        typer.echo(f"\nExtraction methods:")
-        typer.echo(f"   Text-only: {text_count}")
-        typer.echo(f"   Vision: {vision_count}")
+        lines += [
+            "\nExtraction methods:",
+            f"   Text-only: {text_count}",
+            f"   Vision: {vision_count}",
+        ]
 
         if text_count > 0:
             savings_pct = (text_count / successful) * 100
-            typer.echo(f"   Cost savings: ~{savings_pct:.1f}% used cheaper text extraction")
+            lines.append(f"   Cost savings: ~{savings_pct:.1f}% used cheaper text extraction")
 
     output_dir = Path("output") / "datasets"
-    typer.echo(f"\n Datasets saved to: {output_dir}")
+    lines.append(f"\n Datasets saved to: {output_dir}")
+    typer.echo("\n".join(lines))
 
 
 @app.command()
@@ -369,78 +509,88 @@ def _display_search_json(results: list[tuple[str, dict]]) -> None:
     """Display search results in JSON format."""
     typer.echo(f"\n Found {len(results)} matching propert{'y' if len(results) == 1 else 'ies'}:\n")
 
-    output = []
-    for property_id, dataset in results:
-        # Filter to user-visible fields only
-        visible_dataset = _get_user_visible_dataset(dataset)
-        output.append({
-            "property_id": property_id,
-            "dataset": visible_dataset
-        })
+    # Filter to user-visible fields only
+    output = [
+        {"property_id": property_id, "dataset": _get_user_visible_dataset(dataset)}
+        for property_id, dataset in results
+    ]
 
-    typer.echo(json.dumps(output, indent=2))
+    typer.echo(_dumps(output))
 
 
 def _display_search_table(results: list[tuple[str, dict]]) -> None:
     """Display search results in table format."""
     typer.echo(f"\n Found {len(results)} matching propert{'y' if len(results) == 1 else 'ies'}:\n")
 
-    # Header
-    typer.echo("─" * 120)
-    typer.echo(f"{'Property ID':<25} {'Address':<35} {'Parcel':<20} {'County':<15} {'Year':<5}")
-    typer.echo("─" * 120)
+    # Collect rows and emit the table in one write
+    rule = "─" * 120
+    lines = [
+        rule,
+        f"{'Property ID':<25} {'Address':<35} {'Parcel':<20} {'County':<15} {'Year':<5}",
+        rule,
+    ]
 
-    # Rows
     for property_id, dataset in results:
-        address = dataset.get('propertyAddress', 'N/A')
-        parcel = dataset.get('parcelNumber', 'N/A')
-        county = dataset.get('county', 'N/A')
-        year = dataset.get('taxYear', 'N/A')
+        address = str(dataset.get('propertyAddress', 'N/A'))
+        parcel = str(dataset.get('parcelNumber', 'N/A'))
+        county = str(dataset.get('county', 'N/A'))
+        year = str(dataset.get('taxYear', 'N/A'))
 
         # Truncate long values
-        if len(str(address)) > 33:
-            address = str(address)[:30] + "..."
-        if len(str(property_id)) > 23:
+        if len(address) > 33:
+            address = address[:30] + "..."
+        if len(property_id) > 23:
             property_id = property_id[:20] + "..."
 
-        typer.echo(f"{property_id:<25} {address:<35} {parcel:<20} {county:<15} {year:<5}")
+        lines.append(f"{property_id:<25} {address:<35} {parcel:<20} {county:<15} {year:<5}")
+
+    lines.append(rule)
+    typer.echo("\n".join(lines))
 
-    typer.echo("─" * 120)
+
+# CSV column header -> dataset key, shared by search output and export
+CSV_COLUMNS = {
+    'property_id': 'property_id',
+    'tax_year': 'taxYear',
+    'annualized_amount_due': 'annualizedAmountDue',
+    'amount_due_at_closing': 'amountDueAtClosing',
+    'county': 'county',
+    'parcel_number': 'parcelNumber',
+    'next_tax_payment_date': 'nextTaxPaymentDate',
+    'following_tax_payment_date': 'followingTaxPaymentDate',
+    'property_address': 'propertyAddress',
+}
+
+
+def _write_csv(stream, results: list[tuple[str, dict]]) -> None:
+    """Write (property_id, dataset) rows as CSV, blank for missing fields."""
+    csv.writer(stream).writerow(CSV_COLUMNS)
+
+    writer = csv.DictWriter(
+        stream,
+        fieldnames=list(CSV_COLUMNS.values()),
+        restval='',
+        extrasaction='ignore'
+    )
+    writer.writerows({**dataset, 'property_id': property_id} for property_id, dataset in results)
 
 
 def _display_search_csv(results: list[tuple[str, dict]]) -> None:
     """Display search results in CSV format."""
-    import csv
-    import sys
-
-    writer = csv.writer(sys.stdout)
-
-    # Header
-    writer.writerow([
-        'property_id',
-        'tax_year',
-        'annualized_amount_due',
-        'amount_due_at_closing',
-        'county',
-        'parcel_number',
-        'next_tax_payment_date',
-        'following_tax_payment_date',
-        'property_address'
-    ])
-
-    # Rows
-    for property_id, dataset in results:
-        writer.writerow([
-            property_id,
-            dataset.get('taxYear', ''),
-            dataset.get('annualizedAmountDue', ''),
-            dataset.get('amountDueAtClosing', ''),
-            dataset.get('county', ''),
-            dataset.get('parcelNumber', ''),
-            dataset.get('nextTaxPaymentDate', ''),
-            dataset.get('followingTaxPaymentDate', ''),
-            dataset.get('propertyAddress', '')
-        ])
+    # Flush pending output, then write through one large block buffer
+    sys.stdout.flush()
+    out = io.TextIOWrapper(
+        sys.stdout.buffer,
+        encoding=sys.stdout.encoding,
+        newline='',
+        write_through=False
+    )
+    try:
+        _write_csv(out, results)
+        out.flush()
+    finally:
+        # Leave sys.stdout's underlying buffer open
+        out.detach()
 
 
 def _interactive_property_selection(results: list[tuple[str, dict]]) -> None:
@@ -503,44 +653,16 @@ def _display_property_details(property_id: str, dataset: dict) -> None:
     typer.echo("\n Full Dataset:")
     # Filter to user-visible fields only
     visible_dataset = _get_user_visible_dataset(dataset)
-    typer.echo(json.dumps(visible_dataset, indent=2))
+    typer.echo(_dumps(visible_dataset))
 
 
 def _export_property_to_csv(property_id: str, dataset: dict) -> None:
     """Export a single property to CSV file."""
-    import csv
-
     output_file = Path(f"{property_id}.csv")
 
     try:
         with open(output_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-
-            # Header
-            writer.writerow([
-                'property_id',
-                'tax_year',
-                'annualized_amount_due',
-                'amount_due_at_closing',
-                'county',
-                'parcel_number',
-                'next_tax_payment_date',
-                'following_tax_payment_date',
-                'property_address'
-            ])
-
-            # Row
-            writer.writerow([
-                property_id,
-                dataset.get('taxYear', ''),
-                dataset.get('annualizedAmountDue', ''),
-                dataset.get('amountDueAtClosing', ''),
-                dataset.get('county', ''),
-                dataset.get('parcelNumber', ''),
-                dataset.get('nextTaxPaymentDate', ''),
-                dataset.get('followingTaxPaymentDate', ''),
-                dataset.get('propertyAddress', '')
-            ])
+            _write_csv(f, [(property_id, dataset)])
 
         typer.echo(f"\n Exported to: {output_file}")
 
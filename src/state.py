@@ -1,51 +1,57 @@
 """State definitions for the tax certificate extraction agent."""
-from typing import TypedDict, Unpack
+import operator
+from dataclasses import dataclass, field
+from typing import Annotated, Any
 
 # Python 3.12+ type aliases for semantic clarity
 type PropertyID = str
 type FilePath = str
+# PDF bytes are shared by reference through the pipeline (io.BytesIO over bytes
+# does not copy). Kept as bytes rather than memoryview: memoryviews cannot be
+# pickled into the text-extraction process pool, and BytesIO copies them.
 type DocumentTuple = tuple[str, bytes]
 type Dataset = dict[str, str | float | None]
 type ValidationIssue = dict[str, str]
 type ExtractionMethod = str  # "text" or "vision"
 
 
-class AgentState(TypedDict):
+@dataclass(slots=True)
+class AgentState:
     """State for the tax certificate extraction agent.
 
     Supports incremental updates with existing datasets and linked documents.
+    Slotted dataclass: nodes read fields as attributes and return partial
+    update dicts, which LangGraph applies per field.
     """
 
     # Input
     property_id: PropertyID
     zip_file_path: FilePath
-    existing_dataset: Dataset | None  # Previously extracted data
-    linked_documents: list[DocumentTuple]  # Previously processed PDFs
+    existing_dataset: Dataset | None = None  # Previously extracted data
+    linked_documents: list[DocumentTuple] = field(default_factory=list)  # Previously processed PDFs
 
     # Processing
-    new_documents: list[DocumentTuple]  # Fresh PDFs to process
-    all_documents: list[DocumentTuple]  # Combined documents
-    extracted_data: Dataset | None
+    new_documents: list[DocumentTuple] = field(default_factory=list)  # Fresh PDFs to process
+    all_documents: list[DocumentTuple] = field(default_factory=list)  # Combined documents
+    extracted_data: Dataset | None = None
 
     # Output
-    final_dataset: Dataset
-    validation_issues: list[ValidationIssue]
+    final_dataset: Dataset = field(default_factory=dict)
+    validation_issues: list[ValidationIssue] = field(default_factory=list)
 
     # Metadata
-    processing_log: list[str]
-    extraction_method: ExtractionMethod | None  # "text" or "vision"
+    processing_log: Annotated[list[str], operator.add] = field(default_factory=list)  # Nodes return new entries only
+    extraction_method: ExtractionMethod | None = None  # "text" or "vision"
 
 
 def create_agent_state(
     property_id: PropertyID,
     zip_file_path: FilePath,
-    **kwargs: Unpack[AgentState]
+    **kwargs: Any
 ) -> AgentState:
     """
     Create an AgentState with type-safe defaults.
 
-    Python 3.12+ PEP 692 enables IDE autocomplete for AgentState fields.
-
     Args:
         property_id: Unique property identifier
         zip_file_path: Path to the zip file containing tax documents
@@ -54,17 +60,8 @@ def create_agent_state(
     Returns:
         Complete AgentState with all required fields
     """
-    defaults: AgentState = {
-        "property_id": property_id,
-        "zip_file_path": zip_file_path,
-        "existing_dataset": None,
-        "linked_documents": [],
-        "new_documents": [],
-        "all_documents": [],
-        "extracted_data": None,
-        "final_dataset": {},
-        "validation_issues": [],
-        "processing_log": [],
-        "extraction_method": None,
-    }
-    return {**defaults, **kwargs}
+    return AgentState(
+        property_id=property_id,
+        zip_file_path=zip_file_path,
+        **kwargs
+    )
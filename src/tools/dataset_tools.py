@@ -1,9 +1,25 @@
 """Dataset management and persistence tools."""
-import json
+import functools
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from difflib import SequenceMatcher
 from pathlib import Path
+import orjson
 from loguru import logger
 
-from src.config import DATASET_SCHEMA
+try:
+    from rapidfuzz.fuzz import ratio as _fast_ratio
+except ImportError:
+    _fast_ratio = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from src.config import DATASET_SCHEMA, settings
 from src.state import PropertyID, DocumentTuple, Dataset
 
 
@@ -12,6 +28,19 @@ STORAGE_DIR = Path("output")
 DATASETS_DIR = STORAGE_DIR / "datasets"
 DOCUMENTS_DIR = STORAGE_DIR / "documents"
 
+# Archived PDFs stored zstd-compressed (ARCHIVE_ZSTD=1) carry this extra suffix
+ZSTD_SUFFIX = ".zst"
+ARCHIVE_SUFFIXES = (".pdf", ".pdf" + ZSTD_SUFFIX)
+
+# Below this many datasets a thread pool isn't worth starting
+PARALLEL_LOAD_THRESHOLD = 32
+
+# Search index over the datasets (rebuildable; the JSON files stay authoritative)
+INDEX_PATH = STORAGE_DIR / "search_index.sqlite3"
+
+# Bump when the index tables change; older index files are rebuilt
+INDEX_VERSION = 3
+
 
 def _ensure_directories():
     """Create storage directories if they don't exist."""
@@ -19,6 +48,42 @@ def _ensure_directories():
     DOCUMENTS_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _scan_files(dir_path: Path | str, suffix: str | tuple[str, ...]) -> list[os.DirEntry]:
+    """
+    List the files in a directory with the given suffix (or suffixes).
+
+    One scandir pass; the directory entries already say which are files.
+    """
+    with os.scandir(dir_path) as entries:
+        return [
+            entry for entry in entries
+            if entry.name.endswith(suffix) and entry.is_file()
+        ]
+
+
+@functools.lru_cache(maxsize=4096)
+def _read_dataset(dataset_path: str, mtime_ns: int) -> Dataset:
+    """
+    Read and parse a dataset file.
+
+    Cached per (path, mtime), so a rewritten file is re-read automatically
+    and repeated searches don't re-parse every dataset.
+    """
+    with open(dataset_path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def _invalidate_caches() -> None:
+    """
+    Drop cached reads after this process writes or deletes a dataset.
+
+    The mtime keys already catch outside changes; this covers filesystems
+    whose mtime is too coarse to change between two quick writes.
+    """
+    _read_dataset.cache_clear()
+    _scan_property_ids.cache_clear()
+
+
 def get_existing_dataset(property_id: PropertyID) -> Dataset | None:
     """
     Fetch existing partial dataset for a property.
@@ -36,13 +101,15 @@ def get_existing_dataset(property_id: PropertyID) -> Dataset | None:
 
     dataset_path = DATASETS_DIR / f"{property_id}.json"
 
-    if not dataset_path.exists():
-        logger.debug(f"No existing dataset found for property {property_id}")
+    try:
+        mtime_ns = dataset_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        logger.debug("No existing dataset found for property {}", property_id)
         return None
 
     try:
-        with open(dataset_path, 'r') as f:
-            dataset = json.load(f)
+        # Copy so callers can't mutate the cached entry
+        dataset = dict(_read_dataset(str(dataset_path), mtime_ns))
 
         logger.info(f" Loaded existing dataset for {property_id}")
         return dataset
@@ -52,6 +119,17 @@ def get_existing_dataset(property_id: PropertyID) -> Dataset | None:
         return None
 
 
+@functools.cache
+def _archive_compressor() -> "zstandard.ZstdCompressor | None":
+    """Compressor for newly archived PDFs, or None to store them as-is."""
+    if not settings().archive_zstd:
+        return None
+    if zstandard is None:
+        logger.warning("ARCHIVE_ZSTD is set but zstandard is not installed; archiving PDFs uncompressed")
+        return None
+    return zstandard.ZstdCompressor(level=3)
+
+
 def get_linked_documents(property_id: PropertyID) -> list[DocumentTuple]:
     """
     Retrieve previously processed documents for a property.
@@ -70,16 +148,25 @@ def get_linked_documents(property_id: PropertyID) -> list[DocumentTuple]:
     property_docs_dir = DOCUMENTS_DIR / property_id
 
     if not property_docs_dir.exists():
-        logger.debug(f"No linked documents found for property {property_id}")
+        logger.debug("No linked documents found for property {}", property_id)
         return []
 
     documents = []
 
     try:
-        for pdf_path in property_docs_dir.glob("*.pdf"):
-            with open(pdf_path, 'rb') as f:
+        for entry in _scan_files(property_docs_dir, ARCHIVE_SUFFIXES):
+            with open(entry.path, 'rb') as f:
                 pdf_bytes = f.read()
-            documents.append((pdf_path.name, pdf_bytes))
+
+            doc_name = entry.name
+            if doc_name.endswith(ZSTD_SUFFIX):
+                if zstandard is None:
+                    logger.warning(f"Skipping {doc_name}: zstandard is not installed")
+                    continue
+                pdf_bytes = zstandard.ZstdDecompressor().decompress(pdf_bytes)
+                doc_name = doc_name.removesuffix(ZSTD_SUFFIX)
+
+            documents.append((doc_name, pdf_bytes))
 
         logger.info(f" Loaded {len(documents)} linked document(s) for {property_id}")
         return documents
@@ -124,34 +211,50 @@ def update_dataset(
     dataset_path = DATASETS_DIR / f"{property_id}.json"
 
     try:
-        with open(dataset_path, 'w') as f:
-            json.dump(dataset, f, indent=2)
+        with open(dataset_path, 'wb') as f:
+            f.write(orjson.dumps(dataset, option=orjson.OPT_INDENT_2))
 
+        _invalidate_caches()
         logger.info(f" Saved dataset for {property_id} to {dataset_path}")
 
     except Exception as e:
         logger.error(f"Failed to save dataset for {property_id}: {e}")
         raise
 
+    try:
+        with closing(_connect_index()) as conn, conn:
+            stat = dataset_path.stat()
+            _index_upsert(conn, property_id, stat.st_mtime_ns, stat.st_size, dataset)
+    except sqlite3.Error as e:
+        # Non-fatal: the next search re-syncs the index from disk
+        logger.warning(f"Failed to index dataset for {property_id}: {e}")
+
     # Optionally save documents for linking
     if documents:
         property_docs_dir = DOCUMENTS_DIR / property_id
         property_docs_dir.mkdir(parents=True, exist_ok=True)
 
         try:
+            # One listing up front instead of a stat per document
+            archived = {name.removesuffix(ZSTD_SUFFIX) for name in os.listdir(property_docs_dir)}
+            compressor = _archive_compressor()
+
             for filename, pdf_bytes in documents:
                 # Use just the basename to avoid nested directories
-                from pathlib import Path as PathLib
-                doc_name = PathLib(filename).name
-                doc_path = property_docs_dir / doc_name
+                doc_name = Path(filename).name
 
-                # Skip if already exists (don't overwrite)
-                if doc_path.exists():
-                    logger.debug(f"Document {doc_name} already archived, skipping")
+                # Skip if already exists, compressed or not (don't overwrite)
+                if doc_name in archived:
+                    logger.debug("Document {} already archived, skipping", doc_name)
                     continue
 
-                with open(doc_path, 'wb') as f:
-                    f.write(pdf_bytes)
+                if compressor is not None:
+                    with open(property_docs_dir / (doc_name + ZSTD_SUFFIX), 'wb') as f:
+                        f.write(compressor.compress(pdf_bytes))
+                else:
+                    with open(property_docs_dir / doc_name, 'wb') as f:
+                        f.write(pdf_bytes)
+                archived.add(doc_name)
 
             logger.info(f" Archived {len(documents)} document(s) for {property_id}")
 
@@ -171,11 +274,218 @@ def get_all_property_ids() -> list[PropertyID]:
     """
     _ensure_directories()
 
-    property_ids = [
-        path.stem for path in DATASETS_DIR.glob("*.json")
+    # Directory mtime changes whenever a dataset file is added or removed
+    return list(_scan_property_ids(str(DATASETS_DIR), DATASETS_DIR.stat().st_mtime_ns))
+
+
+@functools.lru_cache(maxsize=8)
+def _scan_property_ids(datasets_dir: str, mtime_ns: int) -> tuple[PropertyID, ...]:
+    """List dataset IDs in a directory, cached per (path, mtime)."""
+    return tuple(sorted(entry.name[:-len(".json")] for entry in _scan_files(datasets_dir, ".json")))
+
+
+def _lower_or_none(value) -> str | None:
+    """Lowercased text for a searchable field, None if the field is empty."""
+    return str(value).lower() if value else None
+
+
+def _connect_index() -> sqlite3.Connection:
+    """
+    Open the search index, creating its tables on first use.
+
+    Each row carries the promoted search fields plus the whole dataset as
+    JSON, so a search is answered from the index without opening files.
+    """
+    conn = sqlite3.connect(INDEX_PATH)
+
+    if conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+        # Rebuilt from the JSON files by the next sync
+        conn.executescript(f"""
+            DROP TABLE IF EXISTS idx;
+            DROP TABLE IF EXISTS meta;
+            PRAGMA user_version = {INDEX_VERSION};
+        """)
+
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS idx (
+            property_id TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            tax_year TEXT NOT NULL,
+            county_lc TEXT,
+            parcel_lc TEXT,
+            address_lc TEXT,
+            dataset BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tax_year ON idx (tax_year);
+    """)
+    return conn
+
+
+def _index_upsert(
+    conn: sqlite3.Connection,
+    property_id: PropertyID,
+    mtime_ns: int,
+    size: int,
+    dataset: Dataset
+) -> None:
+    """Insert or replace one property's row in the search index."""
+    conn.execute(
+        "INSERT OR REPLACE INTO idx VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            property_id,
+            mtime_ns,
+            size,
+            str(dataset.get("taxYear", "")),
+            _lower_or_none(dataset.get("county")),
+            _lower_or_none(dataset.get("parcelNumber")),
+            _lower_or_none(dataset.get("propertyAddress")),
+            orjson.dumps(dataset),
+        )
+    )
+
+
+def _sync_index(conn: sqlite3.Connection) -> None:
+    """
+    Bring the index up to date with the datasets directory.
+
+    Runs before every search: one scandir pass stats each dataset, and only
+    files whose mtime or size differ from their indexed row are parsed
+    again; rows for deleted (or unreadable) datasets are dropped. The
+    directory mtime can't stand in for this, since rewriting a dataset in
+    place leaves it unchanged.
+    """
+    indexed = {
+        property_id: (mtime_ns, size)
+        for property_id, mtime_ns, size in conn.execute("SELECT property_id, mtime_ns, size FROM idx")
+    }
+    current = set()
+    reindexed = 0
+
+    for entry in _scan_files(DATASETS_DIR, ".json"):
+        property_id = entry.name[:-len(".json")]
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+
+        if indexed.get(property_id) != (stat.st_mtime_ns, stat.st_size):
+            try:
+                dataset = _read_dataset(entry.path, stat.st_mtime_ns)
+            except (OSError, orjson.JSONDecodeError) as e:
+                logger.warning(f"Not indexing unreadable dataset {property_id}: {e}")
+                continue
+            _index_upsert(conn, property_id, stat.st_mtime_ns, stat.st_size, dataset)
+            reindexed += 1
+
+        current.add(property_id)
+
+    stale = indexed.keys() - current
+    conn.executemany("DELETE FROM idx WHERE property_id = ?", ((pid,) for pid in stale))
+    logger.debug(
+        "Synced search index ({} datasets, {} reindexed, {} removed)",
+        len(current), reindexed, len(stale)
+    )
+
+
+def _index_candidates(
+    address: str | None,
+    parcel: str | None,
+    county: str | None,
+    tax_year: str | None,
+    fuzzy: bool,
+    fuzzy_threshold: float,
+) -> list[tuple[PropertyID, Dataset]]:
+    """
+    Datasets whose indexed fields could match the search, in ID order.
+
+    Substring filters run in SQL; fuzzy filters run on the indexed text,
+    and only the surviving rows' datasets are decoded.
+    """
+    text_filters = [
+        (column, query.lower()) for column, query in (
+            ("address_lc", address), ("parcel_lc", parcel), ("county_lc", county)
+        ) if query
     ]
 
-    return sorted(property_ids)
+    clauses, params = [], []
+    if tax_year:
+        clauses.append("tax_year = ?")
+        params.append(str(tax_year))
+    if not fuzzy:
+        for column, query in text_filters:
+            clauses.append(f"instr({column}, ?) > 0")
+            params.append(query)
+
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    columns = ", ".join(["property_id", "dataset"] + [column for column, _ in text_filters])
+
+    with closing(_connect_index()) as conn, conn:
+        _sync_index(conn)
+        rows = conn.execute(
+            f"SELECT {columns} FROM idx{where} ORDER BY property_id", params
+        ).fetchall()
+
+    if fuzzy:
+        rows = [
+            row for row in rows
+            if all(
+                _fuzzy_match(query, target, fuzzy_threshold)
+                for (_, query), target in zip(text_filters, row[2:])
+            )
+        ]
+
+    return [(row[0], orjson.loads(row[1])) for row in rows]
+
+
+def _fuzzy_match(query: str, target: str | None, threshold: float = 0.6) -> bool:
+    """Check if query fuzzy matches target string."""
+    if not target:
+        return False
+
+    # Case-insensitive comparison
+    query_lower = query.lower()
+    target_lower = target.lower()
+
+    # First try exact substring match
+    if query_lower in target_lower:
+        return True
+
+    # No ratio can beat 2*min/(sum of lengths); skip hopeless pairs before
+    # scoring (after the substring test, which short queries rely on)
+    query_len, target_len = len(query_lower), len(target_lower)
+    if 2 * min(query_len, target_len) < threshold * (query_len + target_len):
+        return False
+
+    # RapidFuzz's ratio (when installed) is an upper bound on SequenceMatcher's:
+    # it counts the longest common subsequence, SequenceMatcher only the
+    # matching blocks it finds. Use it in C to reject pairs, but score with
+    # SequenceMatcher either way so results don't depend on what is installed
+    if _fast_ratio is not None:
+        cutoff = threshold * 100 - 1e-6
+        if _fast_ratio(query_lower, target_lower, score_cutoff=cutoff) < cutoff:
+            return False
+
+    # Then try fuzzy matching
+    ratio = SequenceMatcher(None, query_lower, target_lower).ratio()
+    return ratio >= threshold
+
+
+def _load_datasets(property_ids: list[PropertyID]) -> list[Dataset | None]:
+    """
+    Load datasets for several properties, in the given order.
+
+    Used by search when the SQLite index is unavailable. With
+    SEARCH_LOAD_WORKERS set, large sets are read on a thread pool so
+    file reads overlap; that pays off on high-latency (network) storage.
+    On local disk the reads are cheap and the pool only adds overhead.
+    """
+    workers = min(settings().search_load_workers, len(property_ids))
+    if workers < 2 or len(property_ids) < PARALLEL_LOAD_THRESHOLD:
+        return [get_existing_dataset(property_id) for property_id in property_ids]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(get_existing_dataset, property_ids))
 
 
 def search_properties(
@@ -203,35 +513,21 @@ def search_properties(
     Returns:
         List of (property_id, dataset) tuples matching the criteria
     """
-    from difflib import SequenceMatcher
-
-    def fuzzy_match(query: str, target: str, threshold: float = 0.6) -> bool:
-        """Check if query fuzzy matches target string."""
-        if not target:
-            return False
-
-        # Case-insensitive comparison
-        query_lower = query.lower()
-        target_lower = target.lower()
-
-        # First try exact substring match
-        if query_lower in target_lower:
-            return True
-
-        # Then try fuzzy matching
-        ratio = SequenceMatcher(None, query_lower, target_lower).ratio()
-        return ratio >= threshold
-
     _ensure_directories()
 
     results: list[tuple[PropertyID, Dataset]] = []
 
-    # Get all property IDs
-    all_property_ids = get_all_property_ids()
-
-    for property_id in all_property_ids:
-        dataset = get_existing_dataset(property_id)
+    # Narrow to candidates via the index (datasets come from its rows, which
+    # the sync has just checked against the files); the filters below
+    # re-check each candidate's dataset
+    try:
+        candidates = _index_candidates(address, parcel, county, tax_year, fuzzy, fuzzy_threshold)
+    except sqlite3.Error as e:
+        logger.warning(f"Search index unavailable, scanning all datasets: {e}")
+        property_ids = get_all_property_ids()
+        candidates = list(zip(property_ids, _load_datasets(property_ids)))
 
+    for property_id, dataset in candidates:
         if not dataset:
             continue
 
@@ -242,7 +538,7 @@ def search_properties(
         if address:
             dataset_address = dataset.get("propertyAddress", "")
             if fuzzy:
-                if not fuzzy_match(address, str(dataset_address), fuzzy_threshold):
+                if not _fuzzy_match(address, str(dataset_address), fuzzy_threshold):
                     matches = False
             else:
                 if not dataset_address or address.lower() not in str(dataset_address).lower():
@@ -252,7 +548,7 @@ def search_properties(
         if parcel and matches:
             dataset_parcel = dataset.get("parcelNumber", "")
             if fuzzy:
-                if not fuzzy_match(parcel, str(dataset_parcel), fuzzy_threshold):
+                if not _fuzzy_match(parcel, str(dataset_parcel), fuzzy_threshold):
                     matches = False
             else:
                 if not dataset_parcel or parcel.lower() not in str(dataset_parcel).lower():
@@ -262,7 +558,7 @@ def search_properties(
         if county and matches:
             dataset_county = dataset.get("county", "")
             if fuzzy:
-                if not fuzzy_match(county, str(dataset_county), fuzzy_threshold):
+                if not _fuzzy_match(county, str(dataset_county), fuzzy_threshold):
                     matches = False
             else:
                 if not dataset_county or county.lower() not in str(dataset_county).lower():
@@ -277,7 +573,7 @@ def search_properties(
         if matches:
             results.append((property_id, dataset))
 
-    logger.debug(f"Search found {len(results)} matching properties")
+    logger.debug("Search found {} matching properties", len(results))
     return results
 
 
@@ -296,12 +592,19 @@ def delete_property_data(property_id: PropertyID) -> None:
     dataset_path = DATASETS_DIR / f"{property_id}.json"
     if dataset_path.exists():
         dataset_path.unlink()
+        _invalidate_caches()
         logger.info(f"Deleted dataset for {property_id}")
 
+    try:
+        with closing(_connect_index()) as conn, conn:
+            conn.execute("DELETE FROM idx WHERE property_id = ?", (property_id,))
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to remove {property_id} from search index: {e}")
+
     # Delete archived documents
     property_docs_dir = DOCUMENTS_DIR / property_id
     if property_docs_dir.exists():
-        for doc_path in property_docs_dir.glob("*.pdf"):
-            doc_path.unlink()
+        for entry in _scan_files(property_docs_dir, ARCHIVE_SUFFIXES):
+            os.unlink(entry.path)
         property_docs_dir.rmdir()
         logger.info(f"Deleted archived documents for {property_id}")
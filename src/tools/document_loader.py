@@ -1,13 +1,117 @@
 """Document loading and text extraction utilities."""
 import zipfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import ModuleType
 from pathlib import Path
+import hashlib
+import importlib
 import io
-from pypdf import PdfReader
+import re
+import threading
+import pypdfium2 as pdfium
+from pypdf import PdfReader, PdfWriter, PageObject
 from loguru import logger
 
+from src.config import settings
 from src.state import FilePath, DocumentTuple
 
 
+# Drop-in zlib replacements zipfile can inflate with, fastest first
+UNZIP_BACKENDS = {
+    "isal": "isal.isal_zlib",
+    "zlib-ng": "zlib_ng.zlib_ng",
+    "stdlib": "zlib",
+}
+
+_unzip_backend: str | None = None
+_unzip_module: ModuleType | None = None
+
+# zipfile.zlib is process-wide: readers in other threads share one swap,
+# and the stdlib module goes back once the last of them finishes
+_UNZIP_SWAP_LOCK = threading.Lock()
+_unzip_swap_depth = 0
+_unzip_swap_original: ModuleType | None = None
+
+# Leading pages with no text layer after which a PDF is treated as scanned
+SCANNED_PROBE_PAGES = 2
+
+# Tax-related keywords expected in a usable text layer
+TAX_KEYWORDS = (
+    'tax', 'parcel', 'county', 'amount', 'due', 'payment',
+    'property', 'assessed', 'levy', 'bill'
+)
+
+# A word longer than 5 chars containing 4 consecutive non-vowels (likely gibberish)
+_GIBBERISH_WORD_RE = re.compile(r'(?<!\S)(?=\S{6})\S*?[^aeiouAEIOU\s]{4}\S*')
+
+
+def set_unzip_backend(backend: str = "auto") -> str:
+    """
+    Choose the deflate implementation property zips are read with.
+
+    The backend is only swapped into zipfile while a property zip is being
+    read (see _unzip_with_backend), so zip writers elsewhere in the process
+    keep the stdlib zlib and its full range of compression levels.
+
+    Args:
+        backend: "auto", or one of UNZIP_BACKENDS; auto takes the first
+            one that is installed
+
+    Returns:
+        Name of the backend now in use
+
+    Raises:
+        ValueError: If the backend name is unknown
+        ImportError: If the requested backend is not installed
+    """
+    global _unzip_backend, _unzip_module
+
+    if backend == "auto":
+        candidates = list(UNZIP_BACKENDS)
+    elif backend in UNZIP_BACKENDS:
+        candidates = [backend]
+    else:
+        raise ValueError(f"Unknown unzip backend '{backend}' (use auto, {', '.join(UNZIP_BACKENDS)})")
+
+    for name in candidates:
+        try:
+            module = importlib.import_module(UNZIP_BACKENDS[name])
+        except ImportError:
+            if backend != "auto":
+                raise
+            continue
+
+        _unzip_module = module
+        _unzip_backend = name
+        logger.debug(f"Using {name} unzip backend")
+        return name
+
+
+@contextmanager
+def _unzip_with_backend() -> Iterator[None]:
+    """Point zipfile at the chosen deflate backend for the duration of a read."""
+    global _unzip_swap_depth, _unzip_swap_original
+
+    if _unzip_backend is None:
+        set_unzip_backend(settings().unzip_backend)
+
+    # zipfile looks up decompressobj on its module-level zlib
+    with _UNZIP_SWAP_LOCK:
+        if _unzip_swap_depth == 0:
+            _unzip_swap_original = zipfile.zlib
+            zipfile.zlib = _unzip_module
+        _unzip_swap_depth += 1
+    try:
+        yield
+    finally:
+        with _UNZIP_SWAP_LOCK:
+            _unzip_swap_depth -= 1
+            if _unzip_swap_depth == 0:
+                zipfile.zlib = _unzip_swap_original
+                _unzip_swap_original = None
+
+
 def load_property_documents(zip_path: FilePath) -> list[DocumentTuple]:
     """
     Extract PDF files from a property zip.
@@ -21,7 +125,7 @@ def load_property_documents(zip_path: FilePath) -> list[DocumentTuple]:
     documents = []
 
     try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        with _unzip_with_backend(), zipfile.ZipFile(zip_path, 'r') as zip_ref:
             for file_info in zip_ref.filelist:
                 # Skip macOS metadata files (__MACOSX folder and ._ files)
                 if '__MACOSX' in file_info.filename:
@@ -30,11 +134,17 @@ def load_property_documents(zip_path: FilePath) -> list[DocumentTuple]:
                     continue
 
                 if file_info.filename.lower().endswith('.pdf'):
-                    pdf_bytes = zip_ref.read(file_info.filename)
+                    pdf_bytes = zip_ref.read(file_info)
                     documents.append((file_info.filename, pdf_bytes))
-                    logger.info(f"Loaded: {file_info.filename} ({len(pdf_bytes)} bytes)")
+                    logger.trace("Loaded: {} ({} bytes)", file_info.filename, len(pdf_bytes))
 
-        logger.info(f" Loaded {len(documents)} PDF(s) from {Path(zip_path).name}")
+        # One summary line per zip; per-file lines are at TRACE level
+        logger.info(
+            " Loaded {} PDF(s) from {}: {}",
+            len(documents),
+            Path(zip_path).name,
+            ", ".join(f"{Path(name).name} ({len(pdf_bytes)} bytes)" for name, pdf_bytes in documents)
+        )
         return documents
 
     except Exception as e:
@@ -42,37 +152,179 @@ def load_property_documents(zip_path: FilePath) -> list[DocumentTuple]:
         raise
 
 
-def extract_text_from_pdf(pdf_bytes: bytes) -> str | None:
+# PDFium is not thread-safe: every call into it, from any thread in this
+# process, goes through this lock (pool workers each have their own)
+_PDFIUM_LOCK = threading.Lock()
+
+
+def extract_text_with_validity(pdf_bytes: bytes) -> tuple[bool, str | None]:
     """
-    Extract embedded text from PDF.
+    Extract embedded text from PDF, also reporting whether it could be opened.
+
+    Parsing once here lets callers reuse the result as a validity check
+    instead of re-reading the PDF before sending it to Claude.
 
     Args:
         pdf_bytes: PDF file content as bytes
 
     Returns:
-        Extracted text if successful, None if extraction fails
+        Tuple of (is_valid_pdf, extracted text or None)
     """
+    with _PDFIUM_LOCK:
+        return _extract_text_with_validity(pdf_bytes)
+
+
+def _extract_text_with_validity(pdf_bytes: bytes) -> tuple[bool, str | None]:
+    """Extract text with PDFium; the caller holds _PDFIUM_LOCK."""
+    try:
+        document = pdfium.PdfDocument(pdf_bytes)
+    except Exception as e:
+        logger.warning(f"Invalid/corrupted PDF: {e}")
+        return False, None
+
     try:
-        reader = PdfReader(io.BytesIO(pdf_bytes))
         text_parts = []
 
-        for page_num, page in enumerate(reader.pages, 1):
-            text = page.extract_text()
+        # PDFium does the content-stream parsing in C
+        for index, page in enumerate(document):
+            if index == SCANNED_PROBE_PAGES and not any(part.strip() for part in text_parts):
+                # Scanned document: loading the remaining pages (the costly
+                # part) can't make it usable, vision will read it instead
+                page.close()
+                break
+
+            textpage = page.get_textpage()
+            text = textpage.get_text_range()
+            textpage.close()
+            page.close()
             if text:
-                text_parts.append(text)
+                text_parts.append(text.replace("\r\n", "\n"))
 
         full_text = "\n\n".join(text_parts)
 
         if full_text.strip():
-            logger.debug(f"Extracted {len(full_text)} characters from PDF ({len(reader.pages)} pages)")
-            return full_text
+            logger.debug("Extracted {} characters from PDF ({} pages)", len(full_text), len(document))
+            return True, full_text
         else:
             logger.debug("PDF has no extractable text")
-            return None
+            return True, None
 
     except Exception as e:
         logger.warning(f"Text extraction failed: {e}")
-        return None
+        return True, None
+
+    finally:
+        document.close()
+
+
+def extract_text_from_pdf(pdf_bytes: bytes) -> str | None:
+    """
+    Extract embedded text from PDF.
+
+    Args:
+        pdf_bytes: PDF file content as bytes
+
+    Returns:
+        Extracted text if successful, None if extraction fails
+    """
+    return extract_text_with_validity(pdf_bytes)[1]
+
+
+def is_valid_pdf(pdf_bytes: bytes) -> bool:
+    """
+    Check that a PDF can be opened, without extracting any text.
+
+    Args:
+        pdf_bytes: PDF file content as bytes
+
+    Returns:
+        True if PDFium can open the PDF, False otherwise
+    """
+    with _PDFIUM_LOCK:
+        try:
+            pdfium.PdfDocument(pdf_bytes).close()
+            return True
+        except Exception:
+            return False
+
+
+def _page_fingerprint(page: PageObject) -> bytes:
+    """
+    Hash what a page renders: its content stream plus any XObjects it draws.
+
+    Scanned certificates are often a single image XObject behind a
+    near-identical content stream, so the images have to be part of the hash.
+    """
+    digest = hashlib.sha256()
+
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+
+    resources = page.get("/Resources")
+    xobjects = resources.get_object().get("/XObject") if resources else None
+    if xobjects:
+        xobjects = xobjects.get_object()
+        for name in sorted(xobjects):
+            digest.update(name.encode())
+            digest.update(xobjects[name].get_object().get_data())
+
+    return digest.digest()
+
+
+def dedupe_pdf_pages(documents: list[DocumentTuple]) -> list[DocumentTuple]:
+    """
+    Drop pages that repeat an earlier page, across all documents.
+
+    Only PDFs that lose pages are rewritten; a PDF whose pages are all
+    repeats is dropped. Documents that fail to parse are passed through.
+
+    Args:
+        documents: List of (filename, pdf_bytes) tuples
+
+    Returns:
+        List of (filename, pdf_bytes) tuples with repeated pages removed
+    """
+    seen = set()
+    deduped = []
+    dropped_pages = 0
+
+    for filename, pdf_bytes in documents:
+        try:
+            reader = PdfReader(io.BytesIO(pdf_bytes))
+            kept = []
+            for page in reader.pages:
+                fingerprint = _page_fingerprint(page)
+                if fingerprint not in seen:
+                    seen.add(fingerprint)
+                    kept.append(page)
+        except Exception as e:
+            logger.warning(f"Page dedup skipped for {filename}: {e}")
+            deduped.append((filename, pdf_bytes))
+            continue
+
+        dropped = len(reader.pages) - len(kept)
+        dropped_pages += dropped
+
+        if not kept:
+            logger.info(f" {filename}: all {dropped} page(s) duplicated, skipping")
+            continue
+        if not dropped:
+            deduped.append((filename, pdf_bytes))
+            continue
+
+        writer = PdfWriter()
+        for page in kept:
+            writer.add_page(page)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        deduped.append((filename, buffer.getvalue()))
+        logger.info(f" {filename}: dropped {dropped} duplicate page(s)")
+
+    if dropped_pages:
+        logger.info(f" Page dedup removed {dropped_pages} page(s)")
+
+    return deduped
 
 
 def assess_text_quality(text: str) -> bool:
@@ -94,39 +346,30 @@ def assess_text_quality(text: str) -> bool:
         logger.debug("Text too short for reliable extraction")
         return False
 
-    # Check for tax-related keywords
-    keywords = [
-        'tax', 'parcel', 'county', 'amount', 'due', 'payment',
-        'property', 'assessed', 'levy', 'bill'
-    ]
+    # Check for tax-related keywords (stop scanning once 3 are found)
     text_lower = text.lower()
-    keyword_matches = sum(1 for kw in keywords if kw in text_lower)
+    keyword_matches = 0
+    for kw in TAX_KEYWORDS:
+        if kw in text_lower:
+            keyword_matches += 1
+            if keyword_matches == 3:
+                break
 
     if keyword_matches < 3:
-        logger.debug(f"Only {keyword_matches} tax keywords found (need 3+)")
+        logger.debug("Only {} tax keywords found (need 3+)", keyword_matches)
         return False
 
-    # Check for reasonable word density
-    words = text.split()
+    # Check for reasonable word density (only the first 100 words are needed)
+    words = text.split(maxsplit=100)
     if len(words) < 100:
         logger.debug("Too few words for tax document")
         return False
 
-    # Check for excessive gibberish (words with many consecutive consonants)
-    sample_words = words[:50]  # Check first 50 words
-    gibberish_count = 0
-
-    for word in sample_words:
-        if len(word) > 5:
-            # Look for 4+ consecutive consonants (likely gibberish)
-            for i in range(len(word) - 3):
-                substring = word[i:i+4]
-                if all(c not in 'aeiouAEIOU' for c in substring if c.isalpha()):
-                    gibberish_count += 1
-                    break
+    # Check for excessive gibberish in the first 50 words
+    gibberish_count = len(_GIBBERISH_WORD_RE.findall(" ".join(words[:50])))
 
     if gibberish_count > 10:
-        logger.debug(f"Text appears garbled ({gibberish_count} gibberish words)")
+        logger.debug("Text appears garbled ({} gibberish words)", gibberish_count)
         return False
 
     # FORCE VISION EXTRACTION FOR TESTING
@@ -1,14 +1,57 @@
 """Accuracy testing tool for comparing agent results to ground truth."""
-import json
 from pathlib import Path
 from typing import Any
 import sys
 
+import orjson
+
+
+# Fields scored against ground truth.
+# Note: propertyAddress is excluded from comparison due to formatting variations
+# between documents (all caps vs mixed case). Address search remains case-insensitive.
+COMPARED_FIELDS = (
+    "taxYear",
+    "annualizedAmountDue",
+    "amountDueAtClosing",
+    "county",
+    "parcelNumber",
+    "nextTaxPaymentDate",
+    "followingTaxPaymentDate",
+)
+
+
+# Marker left in ground truth entries that still need checking by hand
+PLACEHOLDER = "VERIFY_VALUE"
+
+
+class UnverifiedGroundTruthError(ValueError):
+    """Ground truth still holds a placeholder for a compared field."""
+
+    def __init__(self, property_id: str, field: str):
+        super().__init__(f"Unverified ground truth for {property_id}.{field}")
+        self.property_id = property_id
+        self.field = field
+
+
+def _normalize_exact(value: str) -> str:
+    return value.strip()
+
+
+def _normalize_casefree(value: str) -> str:
+    return value.lower().strip()
+
+
+# String normalizer per field, resolved once rather than on every comparison
+STRING_NORMALIZERS = {
+    "county": _normalize_casefree,
+    "propertyAddress": _normalize_casefree,
+}
+
 
 def load_json(file_path: Path) -> dict:
     """Load JSON file."""
-    with open(file_path, 'r') as f:
-        return json.load(f)
+    with open(file_path, 'rb') as f:
+        return orjson.loads(f.read())
 
 
 def compare_values(field_name: str, agent_value: Any, ground_truth_value: Any) -> dict:
@@ -58,10 +101,8 @@ def compare_values(field_name: str, agent_value: Any, ground_truth_value: Any) -
     # Handle string values (case-insensitive for some fields)
     if isinstance(agent_value, str) and isinstance(ground_truth_value, str):
         # Case-insensitive comparison for certain fields
-        if field_name in ["county", "propertyAddress"]:
-            match = agent_value.lower().strip() == ground_truth_value.lower().strip()
-        else:
-            match = agent_value.strip() == ground_truth_value.strip()
+        normalize = STRING_NORMALIZERS.get(field_name, _normalize_exact)
+        match = normalize(agent_value) == normalize(ground_truth_value)
 
         if match:
             return {"match": True, "type": "string_match"}
@@ -90,6 +131,10 @@ def compare_property(property_id: str, agent_data: dict, ground_truth_data: dict
 
     Returns:
         Dict with per-field comparison results
+
+    Raises:
+        UnverifiedGroundTruthError: If a compared ground truth value is
+            still the placeholder
     """
     results = {
         "property_id": property_id,
@@ -99,22 +144,11 @@ def compare_property(property_id: str, agent_data: dict, ground_truth_data: dict
         "mismatching_fields": 0
     }
 
-    # Define expected fields
-    # Note: propertyAddress is excluded from comparison due to formatting variations
-    # between documents (all caps vs mixed case). Address search remains case-insensitive.
-    expected_fields = [
-        "taxYear",
-        "annualizedAmountDue",
-        "amountDueAtClosing",
-        "county",
-        "parcelNumber",
-        "nextTaxPaymentDate",
-        "followingTaxPaymentDate"
-    ]
-
-    for field in expected_fields:
+    for field in COMPARED_FIELDS:
         agent_value = agent_data.get(field)
         ground_truth_value = ground_truth_data.get(field)
+        if ground_truth_value == PLACEHOLDER:
+            raise UnverifiedGroundTruthError(property_id, field)
 
         comparison = compare_values(field, agent_value, ground_truth_value)
         results["fields"][field] = comparison
@@ -138,13 +172,8 @@ def calculate_overall_stats(all_results: list[dict]) -> dict:
 
     # Per-field accuracy
     field_stats = {}
-    expected_fields = [
-        "taxYear", "annualizedAmountDue", "amountDueAtClosing",
-        "county", "parcelNumber", "nextTaxPaymentDate",
-        "followingTaxPaymentDate"
-    ]
 
-    for field in expected_fields:
+    for field in COMPARED_FIELDS:
         matches = sum(1 for r in all_results if r["fields"][field]["match"])
         field_stats[field] = {
             "matches": matches,
@@ -231,32 +260,28 @@ def main():
     agent_results = load_json(agent_results_file)
     ground_truth = load_json(ground_truth_file)
 
-    # Check for VERIFY_VALUE placeholders
-    for prop_id, data in ground_truth.items():
-        for field, value in data.items():
-            if field == "_notes":
-                continue
-            if value == "VERIFY_VALUE":
-                print(f" Error: Ground truth contains unverified values")
-                print(f"   Property: {prop_id}, Field: {field}")
-                print("   Please complete the ground truth file before running tests.")
-                sys.exit(1)
-
-    # Compare properties
+    # Compare properties (placeholders are caught during the same pass)
     print(" Comparing agent results to ground truth...\n")
     all_results = []
 
-    for property_id in agent_results.keys():
-        if property_id not in ground_truth:
-            print(f"  Warning: Property {property_id} not in ground truth, skipping...")
-            continue
+    try:
+        for property_id in agent_results.keys():
+            if property_id not in ground_truth:
+                print(f"  Warning: Property {property_id} not in ground truth, skipping...")
+                continue
 
-        result = compare_property(
-            property_id,
-            agent_results[property_id],
-            ground_truth[property_id]
-        )
-        all_results.append(result)
+            result = compare_property(
+                property_id,
+                agent_results[property_id],
+                ground_truth[property_id]
+            )
+            all_results.append(result)
+
+    except UnverifiedGroundTruthError as e:
+        print(f" Error: Ground truth contains unverified values")
+        print(f"   Property: {e.property_id}, Field: {e.field}")
+        print("   Please complete the ground truth file before running tests.")
+        sys.exit(1)
 
     # Calculate stats
     stats = calculate_overall_stats(all_results)
@@ -266,11 +291,11 @@ def main():
 
     # Save detailed results
     output_file = base_dir / "accuracy_report.json"
-    with open(output_file, 'w') as f:
-        json.dump({
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps({
             "statistics": stats,
             "detailed_results": all_results
-        }, f, indent=2)
+        }, option=orjson.OPT_INDENT_2))
 
     print(f"\n Detailed results saved to: {output_file}")
 
@@ -57,6 +57,7 @@ def configure_logging(
             rotation="10 MB",  # Rotate when file reaches 10MB
             retention="7 days",  # Keep logs for 7 days
             compression="zip",  # Compress rotated logs
+            enqueue=True,  # Write (and rotate) on a background thread
             backtrace=True,
             diagnose=True
         )
@@ -1,65 +1,218 @@
 """Dataset validation with schema and business rule checks."""
-from datetime import datetime, date
+import functools
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date
+import fastjsonschema
 from loguru import logger
 
+from src.config import DATASET_SCHEMA
 from src.state import Dataset
 
 type ValidationResult = tuple[bool, list[str]]
 
+# Address words, matched as whole words so alphanumeric IDs don't trip it
+_ADDRESS_PATTERN = r"\b(?:st|ave|rd|blvd|drive|street|avenue)\b"
+_ADDRESS_RE = re.compile(_ADDRESS_PATTERN, re.IGNORECASE)
+
+# County names are stored without this suffix
+_COUNTY_SUFFIX_PATTERN = r" (?:county|parish)"
+_COUNTY_SUFFIX_RE = re.compile(_COUNTY_SUFFIX_PATTERN + "$", re.IGNORECASE)
+
+_NUMERIC: tuple[type, ...] = (int, float)
+
+# The per-field rules below as a compiled schema. It is at least as strict
+# as the Python checks, so a dataset that passes needs only the cross-field
+# and date-relative rules; one that fails gets the full checks (and their
+# specific messages). Patterns are re.search'd, so maxLength pins taxYear.
+_FIELD_RULES_SCHEMA = {
+    **DATASET_SCHEMA,
+    "properties": {
+        **DATASET_SCHEMA["properties"],
+        "taxYear": {"type": "string", "pattern": "^[0-9]{4}", "maxLength": 4},
+        "annualizedAmountDue": {"type": "number", "exclusiveMinimum": 0, "maximum": 1_000_000},
+        "amountDueAtClosing": {"type": "number", "minimum": 0},
+        # Exclusions are lookaheads: fastjsonschema's "not" raises on success
+        "county": {
+            "type": "string",
+            # 2+ chars once stripped, no " County"/" Parish" suffix
+            "pattern": f"(?i)^(?![\\s\\S]*{_COUNTY_SUFFIX_PATTERN}\\s*$)\\s*\\S[\\s\\S]*\\S"
+        },
+        "parcelNumber": {
+            "type": "string",
+            # 3+ chars once stripped, no address indicators
+            "pattern": f"(?i)^(?![\\s\\S]*{_ADDRESS_PATTERN})\\s*\\S[\\s\\S]+\\S"
+        },
+        # Not checked in Python; merges fill it with None when none was found
+        "propertyAddress": {"type": ["string", "null"]},
+    },
+}
+_check_field_rules = fastjsonschema.compile(_FIELD_RULES_SCHEMA)
+
+# Required fields, in the order their missing-field errors are reported
+_REQUIRED_FIELDS = (
+    "taxYear", "annualizedAmountDue", "amountDueAtClosing",
+    "county", "parcelNumber", "nextTaxPaymentDate",
+    "followingTaxPaymentDate"
+)
+_MISSING_ERRORS: dict[str, str] = {
+    field: f"Missing required field: {field}" for field in _REQUIRED_FIELDS
+}
+
+
+@dataclass(frozen=True, slots=True)
+class _ValidationContext:
+    """Date-dependent bounds, computed once rather than per dataset."""
+    current_year: int
+    today: date
+    max_future_date: date
+
+
+@functools.lru_cache(maxsize=1)
+def _context_for(day_ordinal: int) -> _ValidationContext:
+    """Build the context for a day (cached, so repeat calls that day hit it)."""
+    today = date.fromordinal(day_ordinal)
+    return _ValidationContext(
+        current_year=today.year,
+        today=today,
+        max_future_date=date(today.year + 3, 12, 31)
+    )
+
+
+def _current_context() -> _ValidationContext:
+    """Get the validation context for today."""
+    return _context_for(date.today().toordinal())
+
 
 class DatasetValidator:
     """Validate extracted tax datasets against schema and business rules."""
 
-    def validate(self, dataset: Dataset) -> ValidationResult:
+    def validate(self, dataset: Dataset, *, max_errors: int | None = None) -> ValidationResult:
         """
         Validate dataset against schema and business rules.
 
         Args:
             dataset: Extracted dataset to validate
+            max_errors: Stop checking once this many errors are found
+                (None to collect them all)
 
         Returns:
             Tuple of (is_valid, list of error messages)
+
+        Raises:
+            ValueError: If max_errors is less than 1
         """
-        errors = []
+        if max_errors is not None and max_errors < 1:
+            raise ValueError(f"max_errors must be at least 1, got: {max_errors}")
 
-        # Check required fields
-        required = [
-            "taxYear", "annualizedAmountDue", "amountDueAtClosing",
-            "county", "parcelNumber", "nextTaxPaymentDate",
-            "followingTaxPaymentDate"
-        ]
+        return self._validate(dataset, _current_context(), max_errors)
+
+    def is_valid(self, dataset: Dataset) -> bool:
+        """
+        Check whether a dataset passes, stopping at its first error.
+
+        Args:
+            dataset: Extracted dataset to validate
 
-        for field in required:
-            if field not in dataset or dataset[field] is None:
-                errors.append(f"Missing required field: {field}")
+        Returns:
+            True if the dataset has no validation errors
+        """
+        return self.validate(dataset, max_errors=1)[0]
+
+    def validate_many(self, datasets: Iterable[Dataset]) -> list[ValidationResult]:
+        """
+        Validate several datasets against the same date bounds.
+
+        Args:
+            datasets: Extracted datasets to validate
+
+        Returns:
+            (is_valid, list of error messages) per dataset, in input order
+        """
+        ctx = _current_context()
+        return [self._validate(dataset, ctx) for dataset in datasets]
+
+    def _validate(
+        self,
+        dataset: Dataset,
+        ctx: _ValidationContext,
+        max_errors: int | None = None
+    ) -> ValidationResult:
+        """Validate one dataset using precomputed date bounds."""
+        try:
+            _check_field_rules(dataset)
+        except fastjsonschema.JsonSchemaException:
+            checks = self._validate_fields(dataset, ctx)
+        else:
+            checks = self._validate_cross_fields(dataset, ctx)
 
-        # Validate types and formats
-        errors.extend(self._validate_tax_year(dataset))
-        errors.extend(self._validate_amounts(dataset))
-        errors.extend(self._validate_dates(dataset))
-        errors.extend(self._validate_county(dataset))
-        errors.extend(self._validate_parcel_number(dataset))
+        # Checks run lazily, so the rest are skipped once the budget is spent
+        errors = []
+        for found in checks:
+            errors.extend(found)
+            if max_errors is not None and len(errors) >= max_errors:
+                break
 
+        # Decided before trimming to the budget
         is_valid = len(errors) == 0
+        if max_errors is not None:
+            del errors[max_errors:]
 
         if is_valid:
             logger.info(" Validation passed")
         else:
-            logger.warning(f" Validation failed with {len(errors)} errors")
+            logger.warning(" Validation failed with {} errors", len(errors))
             for error in errors:
-                logger.warning(f"  - {error}")
+                logger.warning("  - {}", error)
 
         return is_valid, errors
 
-    def _validate_tax_year(self, dataset: Dataset) -> list[str]:
+    def _validate_cross_fields(
+        self,
+        dataset: Dataset,
+        ctx: _ValidationContext
+    ) -> Iterator[list[str]]:
+        """Yield errors from the rules the schema can't express, check by check."""
+        # Every field is well-formed and non-null
+        yield self._validate_tax_year_range(int(dataset["taxYear"]), ctx)
+        yield self._cross_validate_amounts(dataset)
+        yield self._validate_dates(dataset, ctx)
+
+    def _validate_fields(self, dataset: Dataset, ctx: _ValidationContext) -> Iterator[list[str]]:
+        """Yield errors field by field, for datasets that fail the rules schema."""
+        # Drop null fields once; the helpers then only test membership
+        present = {key: value for key, value in dataset.items() if value is not None}
+
+        # Check required fields
+        yield [
+            message for field, message in _MISSING_ERRORS.items()
+            if field not in present
+        ]
+
+        # Validate types and formats, skipping fields already reported
+        # missing (or empty); each amount is guarded on its own
+        if "taxYear" in present:
+            yield self._validate_tax_year(present, ctx)
+        yield self._validate_amounts(present)
+        if present.get("nextTaxPaymentDate") and present.get("followingTaxPaymentDate"):
+            yield self._validate_dates(present, ctx)
+        if present.get("county"):
+            yield self._validate_county(present)
+        if present.get("parcelNumber"):
+            yield self._validate_parcel_number(present)
+
+    def _validate_tax_year(self, dataset: Dataset, ctx: _ValidationContext) -> list[str]:
         """Validate tax year field."""
         errors = []
 
-        if "taxYear" not in dataset or dataset["taxYear"] is None:
-            return errors  # Already caught by required field check
-
         tax_year = dataset["taxYear"]
 
+        # Common case first: a 4-digit year in range
+        if (isinstance(tax_year, str) and tax_year.isdigit() and len(tax_year) == 4
+                and 2000 <= int(tax_year) <= ctx.current_year + 2):
+            return errors
+
         if not isinstance(tax_year, str):
             errors.append("taxYear must be a string")
             return errors
@@ -68,9 +221,14 @@ class DatasetValidator:
             errors.append(f"taxYear must be a 4-digit year string, got: {tax_year}")
             return errors
 
+        return self._validate_tax_year_range(int(tax_year), ctx)
+
+    def _validate_tax_year_range(self, year: int, ctx: _ValidationContext) -> list[str]:
+        """Check a tax year falls in a reasonable range."""
+        errors = []
+
         # Check reasonable range
-        year = int(tax_year)
-        current_year = datetime.now().year
+        current_year = ctx.current_year
 
         if year < 2000 or year > current_year + 2:
             errors.append(
@@ -84,10 +242,12 @@ class DatasetValidator:
         errors = []
 
         # Validate annualizedAmountDue
-        if "annualizedAmountDue" in dataset and dataset["annualizedAmountDue"] is not None:
+        if "annualizedAmountDue" in dataset:
             amount = dataset["annualizedAmountDue"]
 
-            if not isinstance(amount, (int, float)):
+            if isinstance(amount, _NUMERIC) and 0 < amount <= 1_000_000:
+                pass  # Common case: a positive amount in the normal range
+            elif not isinstance(amount, _NUMERIC):
                 errors.append(f"annualizedAmountDue must be a number, got: {type(amount).__name__}")
             elif amount < 0:
                 errors.append(f"annualizedAmountDue cannot be negative: {amount}")
@@ -97,19 +257,26 @@ class DatasetValidator:
                 errors.append(f"annualizedAmountDue seems unusually high: ${amount:,.2f} (warning)")
 
         # Validate amountDueAtClosing
-        if "amountDueAtClosing" in dataset and dataset["amountDueAtClosing"] is not None:
+        if "amountDueAtClosing" in dataset:
             amount = dataset["amountDueAtClosing"]
 
-            if not isinstance(amount, (int, float)):
+            if isinstance(amount, _NUMERIC) and amount >= 0:
+                pass  # Common case: a non-negative amount
+            elif not isinstance(amount, _NUMERIC):
                 errors.append(f"amountDueAtClosing must be a number, got: {type(amount).__name__}")
             elif amount < 0:
                 errors.append(f"amountDueAtClosing cannot be negative: {amount}")
 
+        errors.extend(self._cross_validate_amounts(dataset))
+
+        return errors
+
+    def _cross_validate_amounts(self, dataset: Dataset) -> list[str]:
+        """Check the closing amount against the annualized amount."""
+        errors = []
+
         # Cross-validate amounts
-        if ("annualizedAmountDue" in dataset and
-            "amountDueAtClosing" in dataset and
-            dataset["annualizedAmountDue"] is not None and
-            dataset["amountDueAtClosing"] is not None):
+        if "annualizedAmountDue" in dataset and "amountDueAtClosing" in dataset:
 
             annualized = dataset["annualizedAmountDue"]
             at_closing = dataset["amountDueAtClosing"]
@@ -124,20 +291,17 @@ class DatasetValidator:
 
         return errors
 
-    def _validate_dates(self, dataset: Dataset) -> list[str]:
+    def _validate_dates(self, dataset: Dataset, ctx: _ValidationContext) -> list[str]:
         """Validate payment date fields."""
         errors = []
 
-        next_date_str = dataset.get("nextTaxPaymentDate")
-        following_date_str = dataset.get("followingTaxPaymentDate")
-
-        if not next_date_str or not following_date_str:
-            return errors  # Already caught by required field check
+        next_date_str = dataset["nextTaxPaymentDate"]
+        following_date_str = dataset["followingTaxPaymentDate"]
 
         try:
             next_date = date.fromisoformat(next_date_str)
             following_date = date.fromisoformat(following_date_str)
-            today = date.today()
+            today = ctx.today
 
             # Next date must be after today's date (per README requirement)
             if next_date <= today:
@@ -153,8 +317,7 @@ class DatasetValidator:
                 )
 
             # Dates shouldn't be too far in the future (sanity check)
-            max_future_date = date(today.year + 3, 12, 31)
-            if following_date > max_future_date:
+            if following_date > ctx.max_future_date:
                 errors.append(
                     f"followingTaxPaymentDate ({following_date}) is too far in the future"
                 )
@@ -168,9 +331,6 @@ class DatasetValidator:
         """Validate county name field."""
         errors = []
 
-        if "county" not in dataset or not dataset["county"]:
-            return errors  # Already caught by required field check
-
         county = dataset["county"]
 
         if not isinstance(county, str):
@@ -180,10 +340,10 @@ class DatasetValidator:
         county = county.strip()
 
         # Check for county suffix (should not be present)
-        if county.lower().endswith(" county") or county.lower().endswith(" parish"):
+        if _COUNTY_SUFFIX_RE.search(county):
             errors.append(
                 f"County should not include 'County/Parish' suffix. "
-                f"Got: '{county}', expected: '{county.replace(' County', '').replace(' Parish', '')}'"
+                f"Got: '{county}', expected: '{_COUNTY_SUFFIX_RE.sub('', county)}'"
             )
 
         # Check minimum length
@@ -196,9 +356,6 @@ class DatasetValidator:
         """Validate parcel number field."""
         errors = []
 
-        if "parcelNumber" not in dataset or not dataset["parcelNumber"]:
-            return errors  # Already caught by required field check
-
         parcel = dataset["parcelNumber"]
 
         if not isinstance(parcel, str):
@@ -212,9 +369,7 @@ class DatasetValidator:
             errors.append(f"parcelNumber seems too short: '{parcel}'")
 
         # Parcel numbers shouldn't look like addresses
-        address_indicators = ['st', 'ave', 'rd', 'blvd', 'drive', 'street', 'avenue']
-        parcel_lower = parcel.lower()
-        if any(indicator in parcel_lower for indicator in address_indicators):
+        if _ADDRESS_RE.search(parcel):
             errors.append(
                 f"parcelNumber appears to be an address, not a parcel ID: '{parcel}'"
             )
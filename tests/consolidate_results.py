@@ -1,33 +1,50 @@
-import json
+import os
 from pathlib import Path
 
+import orjson
+
 # Get project root (parent of tests directory)
 project_root = Path(__file__).parent.parent
 
 # Read all dataset files
 datasets_dir = project_root / "output/datasets"
-all_results = {}
+output_file = project_root / "tests/test_data/agent_results.json"
+output_file.parent.mkdir(exist_ok=True)
 
-for json_file in sorted(datasets_dir.glob("*.json")):
-    # Skip backup files
-    if json_file.name.endswith(".backup"):
-        continue
+# One scandir pass; like the "*.json" glob it replaces, it leaves out
+# "*.json.backup" files, and a missing directory means no results
+try:
+    with os.scandir(datasets_dir) as entries:
+        dataset_files = sorted(
+            (entry for entry in entries
+             if entry.name.endswith(".json") and entry.is_file()),
+            key=lambda entry: entry.name
+        )
+except FileNotFoundError:
+    dataset_files = []
 
-    property_id = json_file.stem
+property_ids = []
 
-    with open(json_file, 'r') as f:
-        dataset = json.load(f)
+# Write consolidated results one property at a time, laid out as
+# json.dump(indent=2) would, so only one dataset is held in memory
+with open(output_file, 'wb') as f:
+    f.write(b"{")
 
-    all_results[property_id] = dataset
+    for entry in dataset_files:
+        property_id = entry.name.removesuffix(".json")
+        with open(entry.path, 'rb') as dataset_file:
+            dataset = orjson.loads(dataset_file.read())
 
-# Write consolidated results
-output_file = project_root / "tests/test_data/agent_results.json"
-output_file.parent.mkdir(exist_ok=True)
+        # Nest the dataset one level deeper (JSON strings hold no raw newlines)
+        nested = orjson.dumps(dataset, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n  ")
+        f.write(b"," if property_ids else b"")
+        f.write(b"\n  " + orjson.dumps(property_id) + b": " + nested)
+
+        property_ids.append(property_id)
 
-with open(output_file, 'w') as f:
-    json.dump(all_results, f, indent=2)
+    f.write(b"\n}" if property_ids else b"}")
 
-print(f" Consolidated {len(all_results)} property results to {output_file}")
+print(f" Consolidated {len(property_ids)} property results to {output_file}")
 print(f"\nProperties included:")
-for prop_id in sorted(all_results.keys()):
+for prop_id in property_ids:
     print(f"  • {prop_id}")
@@ -9,21 +9,24 @@ agent_results_file = project_root / "tests/test_data/agent_results.json"
 with open(agent_results_file, 'r') as f:
     agent_results = json.load(f)
 
+# Fields copied from the agent results, and the placeholder for any it lacks
+TEMPLATE_FIELDS = (
+    "taxYear", "annualizedAmountDue", "amountDueAtClosing", "county",
+    "parcelNumber", "nextTaxPaymentDate", "followingTaxPaymentDate",
+    "propertyAddress"
+)
+PLACEHOLDER = "VERIFY_VALUE"
+NOTES = "Manually verify and update all VERIFY_VALUE entries with ground truth"
+
+TEMPLATE = dict.fromkeys(TEMPLATE_FIELDS, PLACEHOLDER)
+
 # Create ground truth template with same structure
 ground_truth_template = {}
 
 for property_id, agent_data in agent_results.items():
-    ground_truth_template[property_id] = {
-        "taxYear": agent_data.get("taxYear", "VERIFY_VALUE"),
-        "annualizedAmountDue": agent_data.get("annualizedAmountDue", "VERIFY_VALUE"),
-        "amountDueAtClosing": agent_data.get("amountDueAtClosing", "VERIFY_VALUE"),
-        "county": agent_data.get("county", "VERIFY_VALUE"),
-        "parcelNumber": agent_data.get("parcelNumber", "VERIFY_VALUE"),
-        "nextTaxPaymentDate": agent_data.get("nextTaxPaymentDate", "VERIFY_VALUE"),
-        "followingTaxPaymentDate": agent_data.get("followingTaxPaymentDate", "VERIFY_VALUE"),
-        "propertyAddress": agent_data.get("propertyAddress", "VERIFY_VALUE"),
-        "_notes": "Manually verify and update all VERIFY_VALUE entries with ground truth"
-    }
+    record = TEMPLATE | {key: agent_data[key] for key in TEMPLATE_FIELDS if key in agent_data}
+    record["_notes"] = NOTES
+    ground_truth_template[property_id] = record
 
 # Write ground truth template
 output_file = project_root / "tests/test_data/ground_truth_template.json"